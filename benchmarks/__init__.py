@@ -0,0 +1 @@
+"""Benchmarks of the sync and product list queries against a local mock WooCommerce store."""
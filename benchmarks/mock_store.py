@@ -0,0 +1,249 @@
+"""In-process stand-in for the WooCommerce REST API, used by the benchmarks.
+
+Serves a synthetic catalog on ``/wp-json/wc/v3`` with the parts of the API
+the sync uses: paginated ``products`` listings with ``X-WP-Total`` and
+``X-WP-TotalPages`` headers, ``modified_after`` and ``_fields`` filters,
+single product reads and updates and the ``products/batch`` endpoint.
+Listings are always ordered by id. Every request can be delayed by a fixed
+latency plus jitter, and a share of requests can be answered with an error
+to exercise the client's retries. Credentials are not checked.
+
+The server runs on threads of the calling process, so it shares the
+interpreter (and the GIL) with the sync it serves. Listings are sliced from
+precomputed indexes to keep its share of a benchmark small, but timings
+still include the cost of encoding every page in the same process.
+"""
+import bisect
+import json
+import random
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_PATH = '/wp-json/wc/v3'
+CATEGORIES = ('Hardware', 'Garden', 'Kitchen', 'Lighting', 'Tools', 'Paint', 'Plumbing', 'Electrical')
+WORDS = ('steel', 'brass', 'oak', 'compact', 'heavy duty', 'outdoor', 'cordless', 'classic', 'premium', 'mini')
+NOUNS = ('hammer', 'lamp', 'hose', 'drill', 'shelf', 'kettle', 'valve', 'brush', 'socket', 'ladder')
+CATALOG_MODIFIED = datetime(2026, 1, 1)
+
+def generate_catalog(size, seed=0):
+    """Return ``size`` synthetic WooCommerce product payloads, the same for the same seed."""
+    rng = random.Random(seed)
+    products = []
+    for index in range(size):
+        regular_price = round(rng.uniform(1, 500), 2)
+        products.append({
+            'id': 1000 + index,
+            'name': f"{rng.choice(WORDS).title()} {rng.choice(NOUNS)} {index}",
+            'sku': f"SKU-{index:06d}",
+            'regular_price': f"{regular_price:.2f}",
+            'sale_price': f"{regular_price * 0.8:.2f}" if rng.random() < 0.2 else '',
+            'stock_quantity': rng.randint(0, 200),
+            'categories': [{'id': 1 + i, 'name': name, 'slug': name.lower()}
+                           for i, name in enumerate(rng.sample(CATEGORIES, rng.randint(1, 2)))],
+            'date_modified_gmt': (CATALOG_MODIFIED + timedelta(seconds=index)).strftime('%Y-%m-%dT%H:%M:%S'),
+            # Fields the sync does not store, so _fields has something to strip
+            'description': ' '.join(rng.choice(WORDS) for _ in range(60)),
+            'permalink': f"https://shop.example/product/{index}",
+            'images': [{'id': index, 'src': f"https://shop.example/images/{index}.jpg"}],
+        })
+    return products
+
+class MockWooCommerce:
+    """A mock store serving ``catalog`` from a background thread.
+
+    ``latency`` and ``jitter`` are seconds added to every request,
+    ``error_rate`` is the share of requests answered with ``error_status``
+    (retryable by default). Use as a context manager or call ``start`` and
+    ``stop``; ``url`` is the store URL to give to the client.
+    ``clock_offset`` moves the store's clock (Date headers and modification
+    dates) to simulate time passing between syncs.
+    """
+
+    def __init__(self, catalog, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=0):
+        self.products = {product['id']: product for product in catalog}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self.clock_offset = timedelta(0)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # Products in id order, and for modified_after a (date, id) index
+        # rebuilt after the catalog changes, with the last filtered listing
+        self._ordered = [self.products[woo_id] for woo_id in sorted(self.products)]
+        self._version = 0
+        self._dates_version = None
+        self._dates = []
+        self._date_keys = []
+        self._filtered = {}
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def now(self):
+        return datetime.now(timezone.utc) + self.clock_offset
+
+    def touch(self, woo_ids, modified=None):
+        """Mark products as modified in the store, as an edit in WooCommerce would."""
+        modified = (modified or self.now()).strftime('%Y-%m-%dT%H:%M:%S')
+        with self._lock:
+            for woo_id in woo_ids:
+                product = self.products[woo_id]
+                product['stock_quantity'] = (product['stock_quantity'] or 0) + 1
+                product['date_modified_gmt'] = modified
+            self._version += 1
+
+    def _delay(self):
+        """Sleep for the configured latency; returns True when the request should fail."""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if delay:
+            threading.Event().wait(delay)
+        return fail
+
+    def _list_products(self, query):
+        per_page = min(int(query.get('per_page', ['10'])[0]), 100)
+        page = max(int(query.get('page', ['1'])[0]), 1)
+        modified_after = query.get('modified_after', [None])[0]
+        with self._lock:
+            products = self._modified_after(modified_after) if modified_after else self._ordered
+            total = len(products)
+            products = products[(page - 1) * per_page:page * per_page]
+            products = [self._select_fields(product, query) for product in products]
+        headers = {'X-WP-Total': str(total), 'X-WP-TotalPages': str((total + per_page - 1) // per_page)}
+        return products, headers
+
+    def _modified_after(self, modified_after):
+        """Products modified after ``modified_after`` in id order; call with the lock held."""
+        if self._dates_version != self._version:
+            self._dates = sorted((product['date_modified_gmt'], product['id']) for product in self._ordered)
+            self._date_keys = [date for date, _ in self._dates]
+            self._dates_version = self._version
+            self._filtered = {}
+        products = self._filtered.get(modified_after)
+        if products is None:
+            start = bisect.bisect_right(self._date_keys, modified_after)
+            products = [self.products[woo_id] for woo_id in sorted(woo_id for _, woo_id in self._dates[start:])]
+            self._filtered = {modified_after: products}  # Pages of one query share it
+        return products
+
+    @staticmethod
+    def _select_fields(product, query):
+        fields = query.get('_fields', [None])[0]
+        if not fields:
+            return dict(product)
+        return {field: product[field] for field in fields.split(',') if field in product}
+
+    def _update(self, woo_id, values):
+        with self._lock:
+            product = self.products.get(woo_id)
+            if product is None:
+                return None
+            product.update({field: value for field, value in values.items() if field != 'id'})
+            product['date_modified_gmt'] = self.now().strftime('%Y-%m-%dT%H:%M:%S')
+            self._version += 1
+            return dict(product)
+
+    def _handler(self):
+        store = self
+        product_path = re.compile(re.escape(API_PATH) + r'/products/(\d+)$')
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like a real store behind a web server
+
+            def log_message(self, format, *args):
+                pass
+
+            def date_time_string(self, timestamp=None):
+                return formatdate(store.now().timestamp() if timestamp is None else timestamp, usegmt=True)
+
+            def send_json(self, status, body, headers=None):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def read_json(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length)) if length else {}
+
+            def handle_request(self, method):
+                body = self.read_json() if method in ('PUT', 'POST') else None
+                if store._delay():
+                    self.send_json(store.error_status, {'code': 'mock_error', 'message': "Injected error"})
+                    return
+
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                match = product_path.match(url.path)
+                if url.path == f"{API_PATH}/products" and method == 'GET':
+                    products, headers = store._list_products(query)
+                    self.send_json(200, products, headers)
+                elif match and method == 'GET':
+                    product = store.products.get(int(match.group(1)))
+                    if product is None:
+                        self.send_json(404, {'code': 'woocommerce_rest_product_invalid_id'})
+                    else:
+                        self.send_json(200, store._select_fields(product, query))
+                elif match and method == 'PUT':
+                    product = store._update(int(match.group(1)), body)
+                    if product is None:
+                        self.send_json(404, {'code': 'woocommerce_rest_product_invalid_id'})
+                    else:
+                        self.send_json(200, product)
+                elif url.path == f"{API_PATH}/products/batch" and method == 'POST':
+                    results = []
+                    for update in body.get('update', []):
+                        if store._update(update['id'], update) is None:
+                            results.append({'id': update['id'], 'error': {
+                                'code': 'woocommerce_rest_product_invalid_id', 'message': "Invalid ID."}})
+                        else:
+                            results.append({'id': update['id']})
+                    self.send_json(200, {'update': results})
+                else:
+                    self.send_json(404, {'code': 'rest_no_route'})
+
+            def do_GET(self):
+                self.handle_request('GET')
+
+            def do_PUT(self):
+                self.handle_request('PUT')
+
+            def do_POST(self):
+                self.handle_request('POST')
+
+        return Handler
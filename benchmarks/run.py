@@ -0,0 +1,244 @@
+"""Benchmark the sync and the product list queries against a mock store.
+
+Each catalog size gets a fresh temporary database and a MockWooCommerce
+serving a synthetic catalog, then runs, in order:
+
+* ``full_fetch``: fetch every product into the empty database
+* ``full_fetch_unchanged``: fetch them again, nothing to rewrite
+* ``incremental_fetch``: fetch the 1% of products modified in the store
+* ``batch_push``: push local price edits through ``products/batch``
+* ``search``: count and first page of typical searches
+* ``page_render``: the queries and formatting behind the scrolled product list
+
+The mock store serves from threads of this process, so fetch timings
+include its share of the interpreter; compare runs with each other rather
+than with a real store. Results are printed as JSON, or written to
+``--output``, so runs can be compared over time::
+
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1000 --latency-ms 50 --error-rate 0.01 --output results.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import sqlalchemy
+
+from benchmarks.mock_store import MockWooCommerce, generate_catalog
+from database import DatabaseManager
+from logging_config import setup_logging
+from product_table import ProductTableModel, format_product_rows
+from sync_engine import SyncEngine, create_client
+
+logger = logging.getLogger(__name__)
+
+BENCHMARKS = ('full_fetch', 'full_fetch_unchanged', 'incremental_fetch', 'batch_push', 'search', 'page_render')
+SIZES = (1000, 10000, 100000)
+SEARCH_TERMS = ('hammer', 'steel la', 'SKU-0001', 'kitchen', 'premium outdoor drill')
+SORT_COLUMNS = (None, 'name', 'regular_price')
+VISIBLE_ROWS = 20  # Rows the product table shows at once
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='benchmarks.run', description="Benchmark the sync against a mock WooCommerce store.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                        help="catalog sizes to benchmark (default: %(default)s)")
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, help="run only these benchmarks")
+    parser.add_argument('--workers', type=int, default=4, help="concurrent page requests (default: %(default)s)")
+    parser.add_argument('--per-page', type=int, default=100, help="products per page (default: %(default)s)")
+    parser.add_argument('--latency-ms', type=float, default=0, help="latency added to every request")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="random extra latency of up to this much")
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help="share of requests answered with 503, retried by the client")
+    parser.add_argument('--push-count', type=int, default=500, help="products edited for batch_push (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="repetitions of each search and page_render query (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the synthetic catalog and injected errors")
+    parser.add_argument('--output', help="write the results to this file instead of stdout")
+    return parser
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sqlite': sqlite3.sqlite_version,
+        'sqlalchemy': sqlalchemy.__version__,
+        'cpus': os.cpu_count()
+    }
+
+def timings(func, repeat):
+    """Run ``func`` ``repeat`` times and return its latency statistics in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'mean_ms': round(sum(samples) / len(samples), 3),
+        'p50_ms': round(samples[len(samples) // 2], 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'min_ms': round(samples[0], 3)
+    }
+
+def sync_result(summary, seconds, products):
+    """Benchmark figures of a fetch or push summary."""
+    return {
+        'seconds': round(seconds, 3),
+        'products_per_second': round(products / seconds, 1) if seconds else None,
+        **{key: summary[key] for key in ('total', 'processed', 'inserted', 'updated', 'unchanged', 'conflicts',
+                                         'failed_pages', 'failed_chunks', 'pages_fetched') if key in summary},
+        'http': summary['http'],
+        'phase_seconds': summary['seconds']
+    }
+
+class CatalogBenchmark:
+    """The benchmarks of one catalog size, sharing its store and database."""
+
+    def __init__(self, size, args, directory):
+        self.size = size
+        self.args = args
+        self.store = MockWooCommerce(generate_catalog(size, seed=args.seed), latency=args.latency_ms / 1000,
+                                     jitter=args.jitter_ms / 1000, error_rate=args.error_rate, seed=args.seed)
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(directory, f'products_{size}.db')}")
+        self.client = None
+        self.engine = None
+
+    def __enter__(self):
+        self.store.start()
+        # Short backoffs so injected errors cost retries, not minutes of sleeping
+        self.client = create_client((self.store.url, 'ck_benchmark', 'cs_benchmark'), workers=self.args.workers,
+                                    backoff_factor=0.01, max_backoff=0.1)
+        self.engine = SyncEngine(self.db, self.client, workers=self.args.workers, per_page=self.args.per_page)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.client.close()
+        self.store.stop()
+        self.db.engine.dispose()
+
+    def full_fetch(self):
+        started = time.perf_counter()
+        summary = self.engine.fetch_products(resume=False)
+        return sync_result(summary, time.perf_counter() - started, summary['processed'])
+
+    def full_fetch_unchanged(self):
+        return self.full_fetch()
+
+    def incremental_fetch(self):
+        if self.db.get_sync_watermark(self.store.url) is None:
+            self.engine.fetch_products(resume=False)  # An incremental fetch needs a completed fetch first
+        modified = max(1, self.size // 100)
+        self.store.touch(range(1000, 1000 + self.size, max(1, self.size // modified)))
+        started = time.perf_counter()
+        summary = self.engine.fetch_products(incremental=True, resume=False)
+        return sync_result(summary, time.perf_counter() - started, summary['processed'])
+
+    def batch_push(self):
+        if not self.db.get_total_products():
+            self.engine.fetch_products(resume=False)
+        count = min(self.args.push_count, self.size)
+        for woo_id in range(1000, 1000 + count):
+            product = self.db.get_product_by_id(woo_id)
+            self.db.update_product_field(woo_id, 'regular_price', round((product.regular_price or 0) + 1, 2))
+        started = time.perf_counter()
+        summary = self.engine.push_changes()
+        seconds = time.perf_counter() - started
+        return {
+            'seconds': round(seconds, 3),
+            'products_per_second': round(len(summary['pushed']) / seconds, 1) if seconds else None,
+            'total': summary['total'],
+            'pushed': len(summary['pushed']),
+            'failed': len(summary['failures']),
+            'http': summary['http']
+        }
+
+    def search(self):
+        if not self.db.get_total_products():
+            self.engine.fetch_products(resume=False)
+        results = {}
+        for term in SEARCH_TERMS:
+            def query():
+                self.db.clear_count_cache()  # Measure the count query, not the count cache
+                self.db.count_products(term)
+                self.db.search_products_page(search_term=term, limit=VISIBLE_ROWS, as_rows=True)
+            results[term] = {'matches': self.db.count_products(term), **timings(query, self.args.repeat)}
+        return {'queries': results}
+
+    def page_render(self):
+        if not self.db.get_total_products():
+            self.engine.fetch_products(resume=False)
+        model = ProductTableModel(self.db)
+        results = {}
+        for sort_by in SORT_COLUMNS:
+            for position in ('top', 'middle', 'bottom'):
+                start = {'top': 0, 'middle': self.size // 2, 'bottom': self.size - VISIBLE_ROWS}[position]
+
+                def render():
+                    model.refresh(start, VISIBLE_ROWS, sort_by=sort_by)
+                    format_product_rows([model.row(index) for index in range(start, start + VISIBLE_ROWS)
+                                         if model.row(index) is not None], with_tva=True)
+                results[f"{sort_by or 'id'}/{position}"] = timings(render, self.args.repeat)
+        return {'views': results}
+
+def run(args):
+    results = []
+    benchmarks = [name for name in BENCHMARKS if not args.only or name in args.only]
+    with tempfile.TemporaryDirectory(prefix='woo_benchmark_') as directory:
+        for size in args.sizes:
+            with CatalogBenchmark(size, args, directory) as catalog:
+                for name in benchmarks:
+                    logger.info("Running %s on %d products", name, size)
+                    result = getattr(catalog, name)()
+                    results.append({'benchmark': name, 'catalog_size': size, **result})
+                results.append({'benchmark': 'store', 'catalog_size': size, 'requests': catalog.store.requests,
+                                'injected_errors': catalog.store.errors})
+    return results
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Progress lines on stderr, results on stdout; the sync's own logging stays at warnings
+    setup_logging('WARNING', log_file=None)
+    logger.setLevel(logging.INFO)
+    started_at = datetime.now()
+    results = run(args)
+    report = {
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'finished_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'settings': {
+            'store': 'in-process',  # The mock store shares the interpreter with the sync
+            'workers': args.workers,
+            'per_page': args.per_page,
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'error_rate': args.error_rate,
+            'push_count': args.push_count,
+            'repeat': args.repeat,
+            'seed': args.seed
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,37 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, ForeignKey, Boolean, JSON, Index, MetaData, Table, UniqueConstraint, and_, false, func, inspect, make_url, or_, select, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from datetime import datetime
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, timezone
+from collections import namedtuple
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+# Newest revision in migrations/versions. Bump it with every new migration:
+# databases already at this revision skip loading Alembic on startup.
+SCHEMA_REVISION = '0008'
 
 Base = declarative_base()
 
 class Product(Base):
     __tablename__ = 'products'
+    __table_args__ = (
+        Index('ix_products_sku', 'sku'),
+        Index('ix_products_dirty', 'dirty', sqlite_where=text('dirty')),
+        # Sort indexes for the product listing
+        Index('ix_products_name_nocase', text('name COLLATE NOCASE')),
+        Index('ix_products_regular_price', 'regular_price'),
+        Index('ix_products_sale_price', 'sale_price'),
+        Index('ix_products_stock_quantity', 'stock_quantity'),
+        Index('ix_products_last_synced', 'last_synced'),
+    )
     
     id = Column(Integer, primary_key=True)
     woo_id = Column(Integer, unique=True)  # WooCommerce product ID
@@ -17,7 +42,10 @@ class Product(Base):
     stock_quantity = Column(Integer, nullable=True)
     categories = Column(String, nullable=True)  # Store category names as comma-separated string
     last_synced = Column(DateTime, default=datetime.now)  # Changed to use local time
+    dirty = Column(Boolean, nullable=False, default=False, server_default=false())  # Edited locally, not yet pushed to WooCommerce
+    content_hash = Column(String(32), nullable=True)  # Hash of the synced fields, see DatabaseManager._product_values
     vendor_stocks = relationship('VendorStock', back_populates='product')
+    changes = relationship('ProductChange', back_populates='product', cascade='all, delete-orphan')
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -29,6 +57,8 @@ class Product(Base):
         self.stock_quantity = kwargs.get('stock_quantity')
         self.categories = kwargs.get('categories')
         self.last_synced = kwargs.get('last_synced', datetime.now())
+        self.dirty = kwargs.get('dirty', False)
+        self.content_hash = kwargs.get('content_hash')
 
 class Vendor(Base):
     __tablename__ = 'vendors'
@@ -44,6 +74,10 @@ class Vendor(Base):
 
 class VendorStock(Base):
     __tablename__ = 'vendor_stocks'
+    __table_args__ = (
+        Index('ix_vendor_stocks_product_vendor', 'product_id', 'vendor_id', unique=True),
+        Index('ix_vendor_stocks_vendor_id', 'vendor_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     product_id = Column(Integer, ForeignKey('products.id'))
@@ -54,42 +88,245 @@ class VendorStock(Base):
     product = relationship('Product', back_populates='vendor_stocks')
     vendor = relationship('Vendor', back_populates='stocks')
 
+# FTS5 index over products.name/sku/categories, kept in sync by triggers
+# (migrations/versions/0003_products_fts.py). It lives outside Base.metadata
+# because it is a virtual table the ORM must never try to create.
+products_fts = Table(
+    'products_fts', MetaData(),
+    Column('rowid', Integer),
+    Column('name', String),
+    Column('sku', String),
+    Column('categories', String),
+    Column('rank', Float),
+    Column('products_fts', String)  # Hidden column used as the MATCH target
+)
+
+# One page of a keyset-paginated listing. A cursor is the (sort value, id) key
+# of the row before a page; FIRST_PAGE starts at the beginning and a None
+# cursor means there is no such page.
+ProductPage = namedtuple('ProductPage', ['products', 'prev_cursor', 'next_cursor'])
+FIRST_PAGE = ()
+
+# Outcome of DatabaseManager.bulk_upsert_products, in products. Conflicts
+# are products with unpushed local edits, which were left untouched.
+UpsertResult = namedtuple('UpsertResult', ['inserted', 'updated', 'unchanged', 'conflicts'])
+
+# Displayed columns of a product, read without loading ORM instances.
+# last_synced is preformatted by SQLite as 'YYYY-MM-DD HH:MM'.
+ProductRow = namedtuple('ProductRow', ['woo_id', 'name', 'sku', 'regular_price', 'sale_price',
+                                       'stock_quantity', 'last_synced'])
+PRODUCT_ROW_COLUMNS = (
+    Product.woo_id, Product.name, Product.sku, Product.regular_price, Product.sale_price,
+    Product.stock_quantity, func.strftime('%Y-%m-%d %H:%M', Product.last_synced).label('last_synced')
+)
+
+class ProductChange(Base):
+    """A locally edited field of a product that has not been pushed yet."""
+    __tablename__ = 'product_changes'
+    __table_args__ = (UniqueConstraint('product_id', 'field_name'),)
+    
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    field_name = Column(String, nullable=False)
+    baseline_value = Column(JSON, nullable=True)  # Value last synced with WooCommerce
+    edited_at = Column(DateTime, default=datetime.now)
+    product = relationship('Product', back_populates='changes')
+
+class SyncState(Base):
+    __tablename__ = 'sync_state'
+    
+    id = Column(Integer, primary_key=True)
+    store_url = Column(String, unique=True)
+    last_modified = Column(DateTime, nullable=True)  # Newest WooCommerce date_modified_gmt seen
+    last_sync = Column(DateTime, nullable=True)
+
+class SyncRun(Base):
+    """A fetch from or push to a store with its metrics; fetches are checkpointed page by page so they can resume."""
+    __tablename__ = 'sync_runs'
+    __table_args__ = (Index('ix_sync_runs_store_url_mode', 'store_url', 'mode'),)
+    
+    id = Column(Integer, primary_key=True)
+    store_url = Column(String, nullable=False)
+    mode = Column(String, nullable=False)  # full, incremental or push
+    status = Column(String, nullable=False, default='running')  # running, interrupted, completed or abandoned
+    per_page = Column(Integer, nullable=False)
+    modified_after = Column(String, nullable=True)  # modified_after of an incremental run, reused on resume
+    total_pages = Column(Integer, nullable=True)
+    latest_modified = Column(DateTime, nullable=True)  # Newest date_modified_gmt written by the run
+    started_at = Column(DateTime, default=datetime.now)
+    store_started_at = Column(DateTime, nullable=True)  # Store's UTC clock at the first request, caps the watermark
+    ended_at = Column(DateTime, nullable=True)
+    # Metrics, summed over the attempts of a resumed run except the totals
+    # and latencies, which describe the latest attempt
+    products_total = Column(Integer, nullable=True)
+    products_processed = Column(Integer, nullable=True)  # Written by a fetch, accepted by WooCommerce for a push
+    products_inserted = Column(Integer, nullable=True)
+    products_updated = Column(Integer, nullable=True)
+    products_unchanged = Column(Integer, nullable=True)
+    products_failed = Column(Integer, nullable=True)  # Rejected by WooCommerce during a push
+    pages_fetched = Column(Integer, nullable=True)
+    failed_pages = Column(Integer, nullable=True)
+    failed_chunks = Column(Integer, nullable=True)
+    requests = Column(Integer, nullable=True)
+    bytes_received = Column(Integer, nullable=True)  # Response bytes of the run's requests as sent over the wire
+    latency_p50_ms = Column(Float, nullable=True)
+    latency_p95_ms = Column(Float, nullable=True)
+    latency_max_ms = Column(Float, nullable=True)
+    write_seconds = Column(Float, nullable=True)  # Spent upserting products
+    queue_wait_seconds = Column(Float, nullable=True)  # Writer waiting for fetched pages
+    fetch_wait_seconds = Column(Float, nullable=True)  # Fetch threads waiting for the writer
+    duration_seconds = Column(Float, nullable=True)
+    pages = relationship('SyncRunPage', back_populates='run', cascade='all, delete-orphan')
+
+class SyncRunPage(Base):
+    """A page of a sync run that was written or failed to download."""
+    __tablename__ = 'sync_run_pages'
+    __table_args__ = (UniqueConstraint('run_id', 'page'),)
+    
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey('sync_runs.id'), nullable=False)
+    page = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)  # completed or failed
+    error = Column(String, nullable=True)
+    run = relationship('SyncRun', back_populates='pages')
+
+# Metrics added up by DatabaseManager.record_sync_metrics when a run resumes
+SYNC_RUN_COUNTERS = (
+    'products_processed', 'products_inserted', 'products_updated', 'products_unchanged', 'products_failed',
+    'pages_fetched', 'failed_pages', 'failed_chunks', 'requests', 'bytes_received', 'write_seconds',
+    'queue_wait_seconds', 'fetch_wait_seconds', 'duration_seconds'
+)
+
+# Where a fetch run starts: a new run has no completed pages, a resumed one
+# continues with the modified_after query and pages of the interrupted run
+SyncCheckpoint = namedtuple('SyncCheckpoint', ['run_id', 'resumed', 'modified_after', 'completed_pages',
+                                               'latest_modified', 'store_started_at'])
+
 class DatabaseManager:
-    def __init__(self, db_path='sqlite:///products.db'):
-        self.engine = create_engine(db_path)
+    # Settings applied to every SQLite connection; override them with the
+    # pragmas argument (the sqlite_pragmas key of config.json). WAL lets the
+    # product list read while a sync writes, and synchronous=NORMAL is still
+    # crash safe in WAL mode, it only syncs at checkpoints.
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,  # ms to wait for a writer instead of failing with "database is locked"
+        'cache_size': -65536,  # Negative means KiB, 64 MB of page cache per connection
+        'mmap_size': 268435456,  # Read through 256 MB of memory mapped I/O
+        'temp_store': 'MEMORY'
+    }
+    
+    # Columns the product listing can be ordered by, each backed by an index.
+    # NULLs sort first ascending and last descending, like SQLite's indexes.
+    SORT_COLUMNS = ('id', 'woo_id', 'name', 'sku', 'regular_price', 'sale_price', 'stock_quantity', 'last_synced')
+    NOCASE_SORT_COLUMNS = ('name',)
+    
+    def __init__(self, db_path='sqlite:///products.db', pragmas=None):
+        self.pragmas = {**self.SQLITE_PRAGMAS, **(pragmas or {})}
+        for name, value in self.pragmas.items():
+            if not re.fullmatch(r'\w+', name) or not re.fullmatch(r'-?\w+', str(value)):
+                raise ValueError(f"Invalid SQLite pragma: {name} = {value}")
+        
+        # One connection per thread at a time: the UI, the list query worker
+        # and the sync writer each check out their own. In-memory databases
+        # keep SQLAlchemy's single connection pool, which takes no sizes.
+        in_memory = make_url(db_path).database in (None, '', ':memory:')
+        pool_sizes = {} if in_memory else {'pool_size': 8, 'max_overflow': 8}
+        self.engine = create_engine(db_path, connect_args={'check_same_thread': False}, **pool_sizes)
+        event.listen(self.engine, 'connect', self._apply_pragmas)
         self.Session = sessionmaker(bind=self.engine)
-        Base.metadata.create_all(self.engine)
+        # Product counts per normalized search, dropped whenever products are written
+        self._count_cache = {}
+        self._products_version = 0
+        self._count_lock = threading.Lock()
+        if self.get_schema_version() != SCHEMA_REVISION:
+            self.upgrade_schema()
+    
+    def _apply_pragmas(self, dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+    
+    def upgrade_schema(self):
+        """Bring the database to the latest Alembic revision.
+        
+        The applied revision is recorded in the ``alembic_version`` table;
+        databases created before migrations existed are upgraded in place.
+        """
+        from alembic import command
+        from alembic.config import Config
+        
+        config = Config()
+        config.set_main_option('script_location', MIGRATIONS_DIR)
+        with self.engine.begin() as connection:
+            config.attributes['connection'] = connection
+            command.upgrade(config, 'head')
+    
+    def get_schema_version(self):
+        """Return the applied Alembic revision, None for an unversioned database."""
+        with self.engine.connect() as connection:
+            if not inspect(connection).has_table('alembic_version'):
+                return None
+            return connection.execute(text('SELECT version_num FROM alembic_version')).scalar()
     
     def get_session(self):
         return self.Session()
     
-    def add_or_update_product(self, product_data):
+    def _products_changed(self):
+        with self._count_lock:
+            self._products_version += 1
+            self._count_cache.clear()
+    
+    @staticmethod
+    def _clear_changes(session, woo_ids):
+        # Pending edits of these products are now either pushed or overwritten
+        session.query(ProductChange).filter(
+            ProductChange.product_id.in_(select(Product.id).where(Product.woo_id.in_(woo_ids)))
+        ).delete(synchronize_session=False)
+    
+    @staticmethod
+    def _product_values(record):
+        """Map a woo_client.ProductRecord to ``products`` column values.
+        
+        ``content_hash`` digests the normalized synced fields, so a product
+        whose hash is unchanged needs no write.
+        """
+        values = {
+            'woo_id': record.id,
+            'name': record.name,
+            'sku': record.sku,
+            'regular_price': float(record.regular_price) if record.regular_price else None,
+            'sale_price': float(record.sale_price) if record.sale_price else None,
+            'stock_quantity': int(record.stock_quantity) if record.stock_quantity else None,
+            # Stored as a comma-separated string
+            'categories': ', '.join(record.categories) or None
+        }
+        normalized = json.dumps(list(values.values()), separators=(',', ':'))
+        values['content_hash'] = hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+        values['last_synced'] = datetime.now()  # Changed to use local time
+        values['dirty'] = False  # Local values now match WooCommerce
+        return values
+    
+    def add_or_update_product(self, record):
         session = self.get_session()
         try:
-            product = session.query(Product).filter_by(woo_id=product_data['id']).first()
+            product = session.query(Product).filter_by(woo_id=record.id).first()
             
             if not product:
                 product = Product()
             
             # Update product attributes
-            product.woo_id = product_data['id']
-            product.name = product_data['name']
-            product.sku = product_data.get('sku', '')
-            product.regular_price = float(product_data.get('regular_price', 0)) if product_data.get('regular_price') else None
-            product.sale_price = float(product_data.get('sale_price', 0)) if product_data.get('sale_price') else None
-            product.stock_quantity = int(product_data.get('stock_quantity', 0)) if product_data.get('stock_quantity') else None
-            # Convert categories list to comma-separated string
-            categories = product_data.get('categories', [])
-            if categories and isinstance(categories, list):
-                product.categories = ', '.join(cat['name'] for cat in categories)
-            else:
-                product.categories = None
-                
-            product.last_synced = datetime.now()  # Changed to use local time
+            for field, value in self._product_values(record).items():
+                setattr(product, field, value)
             
             if product.id is None:
                 session.add(product)
+            self._clear_changes(session, [product.woo_id])
             session.commit()
+            self._products_changed()
             return product.id
         except Exception as e:
             session.rollback()
@@ -97,6 +334,69 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def bulk_upsert_products(self, records):
+        """Insert or update many woo_client.ProductRecords in a single transaction.
+        
+        Uses SQLite's ``INSERT ... ON CONFLICT(woo_id) DO UPDATE`` so a whole
+        page (or chunk of pages) costs one statement and one commit instead of
+        a SELECT and a commit per product. Products whose content hash is
+        unchanged are not rewritten, only their ``last_synced`` is bumped in
+        one UPDATE. Products with local edits that are not pushed yet are
+        skipped and counted as conflicts, so a scheduled fetch never discards
+        them. Returns an UpsertResult.
+        """
+        rows = {}
+        for record in records:
+            row = self._product_values(record)
+            rows[row['woo_id']] = row  # A product repeated across pages is written once
+        if not rows:
+            return UpsertResult(0, 0, 0, 0)
+        
+        # Read the stored hashes before the write transaction starts, so it
+        # begins with a write and never has to upgrade a stale read snapshot
+        session = self.get_session()
+        try:
+            stored = {woo_id: (content_hash, dirty) for woo_id, content_hash, dirty in
+                      session.query(Product.woo_id, Product.content_hash, Product.dirty)
+                      .filter(Product.woo_id.in_(list(rows)))}
+        finally:
+            session.close()
+        
+        conflicts = [woo_id for woo_id in rows if woo_id in stored and stored[woo_id][1]]
+        changed = [row for woo_id, row in rows.items() if stored.get(woo_id) != (row['content_hash'], False)
+                   and woo_id not in conflicts]
+        unchanged = [woo_id for woo_id, row in rows.items() if stored.get(woo_id) == (row['content_hash'], False)]
+        inserted = sum(1 for row in changed if row['woo_id'] not in stored)
+        if conflicts:
+            logger.warning("Kept %d products with unpushed local edits instead of overwriting them: %s%s",
+                           len(conflicts), ', '.join(map(str, conflicts[:10])), '...' if len(conflicts) > 10 else '')
+        
+        session = self.get_session()
+        try:
+            if changed:
+                stmt = sqlite_insert(Product)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Product.woo_id],
+                    set_={field: stmt.excluded[field] for field in changed[0] if field != 'woo_id'},
+                    where=Product.dirty.is_(False)  # Edited since the hashes were read
+                )
+                session.execute(stmt, changed)
+            if unchanged:
+                session.query(Product).filter(Product.woo_id.in_(unchanged)).update(
+                    {Product.last_synced: datetime.now()}, synchronize_session=False
+                )
+            session.commit()
+            if changed:
+                self._products_changed()
+            result = UpsertResult(inserted, len(changed) - inserted, len(unchanged), len(conflicts))
+            logger.debug("Upserted products: %s", result)
+            return result
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
     def get_product(self, product_id):
         session = self.get_session()
         try:
@@ -104,20 +404,161 @@ class DatabaseManager:
         finally:
             session.close()
     
+    @staticmethod
+    def _fts_query(search_term):
+        """Turn free text into an FTS5 query matching every word as a prefix.
+        
+        Words are quoted so characters like ``-`` or ``:`` in SKUs are never
+        parsed as FTS5 syntax. Returns None when there is nothing to match.
+        """
+        words = re.findall(r'\w+', search_term or '')
+        if not words:
+            return None
+        return ' '.join(f'"{word}"*' for word in words)
+    
+    @staticmethod
+    def _filter_search(query, fts_query):
+        if fts_query:
+            query = query.join(products_fts, products_fts.c.rowid == Product.id).filter(
+                products_fts.c.products_fts.match(fts_query)
+            )
+        return query
+    
     def search_products(self, search_term=None, limit=100, offset=0):
+        """Search products by name, SKU and categories through the FTS5 index.
+        
+        Every word of ``search_term`` must match the start of a word in one of
+        those columns; results are ordered by relevance, then by id.
+        """
         session = self.get_session()
         try:
-            query = session.query(Product)
-            if search_term:
-                search_term = f'%{search_term}%'
-                query = query.filter(
-                    (Product.name.ilike(search_term)) |
-                    (Product.sku.ilike(search_term))
-                )
+            fts_query = self._fts_query(search_term)
+            query = self._filter_search(session.query(Product), fts_query)
+            if fts_query:
+                query = query.order_by(products_fts.c.rank, Product.id)
+            else:
+                query = query.order_by(Product.id)
             return query.limit(limit).offset(offset).all()
         finally:
             session.close()
     
+    def _sort_column(self, sort_by, fts_query):
+        if sort_by is None:
+            sort_by = 'rank' if fts_query else 'id'
+        if sort_by == 'rank':
+            if not fts_query:
+                raise ValueError("Sorting by rank requires a search term")
+            return products_fts.c.rank
+        if sort_by not in self.SORT_COLUMNS:
+            raise ValueError(f"Cannot sort products by {sort_by!r}")
+        column = getattr(Product, sort_by)
+        if sort_by in self.NOCASE_SORT_COLUMNS:
+            # Matches the NOCASE index so the order is case-insensitive and indexed
+            column = column.collate('NOCASE')
+        return column
+    
+    @staticmethod
+    def _keyset_segments(key, cursor, descending):
+        """Conditions selecting the rows after ``cursor`` in (key, id) order.
+        
+        SQLite sorts NULLs first ascending and last descending, which is also
+        how its indexes are laid out. Rows past the cursor are split into
+        segments that are each a single index range, so every query can seek
+        instead of scanning: an OR with IS NULL, or a row-value comparison on
+        a collated column, would make SQLite walk the index from its start.
+        """
+        if not cursor:
+            return [None]
+        value, row_id = cursor
+        if descending:
+            if value is None:
+                return [and_(key.is_(None), Product.id < row_id)]
+            return [and_(key <= value, or_(key < value, Product.id < row_id)), key.is_(None)]
+        if value is None:
+            return [and_(key.is_(None), Product.id > row_id), key.isnot(None)]
+        return [and_(key >= value, or_(key > value, Product.id > row_id))]
+    
+    def _keyset_rows(self, session, columns, fts_query, key, after, descending, offset, limit):
+        order = (key.desc(), Product.id.desc()) if descending else (key, Product.id)
+        rows = []
+        for condition in self._keyset_segments(key, after, descending):
+            query = self._filter_search(session.query(*columns), fts_query)
+            if condition is not None:
+                query = query.filter(condition)
+            segment_rows = query.order_by(*order).offset(offset).limit(limit - len(rows)).all()
+            rows.extend(segment_rows)
+            if len(rows) >= limit:
+                break
+            if offset:
+                # Whatever is left of the offset applies to the next segment
+                offset = 0 if segment_rows else max(0, offset - query.count())
+        return rows
+    
+    def search_products_page(self, search_term=None, limit=50, after=FIRST_PAGE, sort_by=None, descending=False,
+                             as_rows=False, with_prev=False):
+        """Return the page of products following the ``after`` cursor.
+        
+        Pages are ordered by ``sort_by`` (a column in SORT_COLUMNS, or
+        ``'rank'``; defaults to relevance when searching and id otherwise)
+        with the product id as tie breaker, and are located by seeking to the
+        cursor instead of skipping rows, so deep pages cost the same as the
+        first one. The returned cursors can be passed back as ``after``;
+        ``prev_cursor`` costs a second, backward query and is only looked up
+        ``with_prev``, it is None otherwise.
+        
+        With ``as_rows`` the page holds ProductRow tuples of the displayed
+        columns instead of Product instances.
+        """
+        fts_query = self._fts_query(search_term)
+        key = self._sort_column(sort_by, fts_query)
+        columns = (*PRODUCT_ROW_COLUMNS, Product.id, key) if as_rows else (Product, Product.id, key)
+        session = self.get_session()
+        try:
+            rows = self._keyset_rows(session, columns, fts_query, key, after, descending, 0, limit + 1)
+        finally:
+            session.close()
+        
+        if as_rows:
+            products = [ProductRow._make(row[:-2]) for row in rows[:limit]]
+        else:
+            products = [row[0] for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = (rows[limit - 1][-1], rows[limit - 1][-2])
+        
+        prev_cursor = None
+        if with_prev and after:
+            prev_cursor = self.skip_cursor(search_term, after, -limit, sort_by, descending)
+        return ProductPage(products, prev_cursor, next_cursor)
+    
+    def skip_cursor(self, search_term, cursor, rows, sort_by=None, descending=False):
+        """Move a page cursor ``rows`` rows forward (or backward if negative).
+        
+        Only the sort key and id are read, so jumping many pages is an
+        index-only walk instead of materializing the skipped products.
+        Returns FIRST_PAGE when moving back past the start and None when
+        moving forward past the end.
+        """
+        if rows == 0:
+            return cursor
+        fts_query = self._fts_query(search_term)
+        key = self._sort_column(sort_by, fts_query)
+        forward = rows > 0
+        if not cursor and not forward:
+            return FIRST_PAGE
+        
+        session = self.get_session()
+        try:
+            # Walking backwards is walking forwards in the reversed order
+            found = self._keyset_rows(session, (key, Product.id), fts_query, key, cursor,
+                                      descending if forward else not descending, abs(rows) - 1, 1)
+        finally:
+            session.close()
+        
+        if not found:
+            return None if forward else FIRST_PAGE
+        return (found[0][0], found[0][1])
+    
     def add_vendor(self, name, api_url, api_key, api_secret):
         session = self.get_session()
         try:
@@ -163,9 +604,66 @@ class DatabaseManager:
             session.close()
     
     def get_total_products(self):
+        return self.count_products()
+    
+    def _check_external_writes(self, session):
+        """Drop the cached counts if another connection committed since this one last looked.
+        
+        ``PRAGMA data_version`` changes when any other connection, including
+        one in another process such as ``sync_cli``, commits. Its values are
+        only comparable on the same connection, so the last one seen is kept
+        in the pooled connection's ``info``; a connection seen for the first
+        time drops the cache too.
+        """
+        connection = session.connection()
+        data_version = connection.exec_driver_sql('PRAGMA data_version').scalar()
+        info = connection.connection.info
+        if info.get('data_version') != data_version:
+            info['data_version'] = data_version
+            self._products_changed()
+    
+    def count_products(self, search_term=None):
+        """Count the products search_products would return for ``search_term``.
+        
+        Counts are cached per search until products are written, through this
+        manager or by another process, so paging through results does not
+        recount.
+        """
+        fts_query = self._fts_query(search_term)
         session = self.get_session()
         try:
-            return session.query(Product).count()
+            self._check_external_writes(session)
+            with self._count_lock:
+                version = self._products_version
+                if fts_query in self._count_cache:
+                    return self._count_cache[fts_query]
+            
+            if fts_query:
+                count = session.query(func.count()).select_from(products_fts).filter(
+                    products_fts.c.products_fts.match(fts_query)
+                ).scalar()
+            else:
+                count = session.query(func.count(Product.id)).scalar()
+        finally:
+            session.close()
+        
+        with self._count_lock:
+            # Don't cache a count that raced with a write
+            if version == self._products_version:
+                if len(self._count_cache) >= 256:
+                    self._count_cache.clear()
+                self._count_cache[fts_query] = count
+        return count
+    
+    def clear_count_cache(self):
+        """Forget the cached product counts, so the next counts query the database."""
+        self._products_changed()
+    
+    def get_products_by_sku(self, sku):
+        # SKUs are not unique, several products may share one
+        session = self.get_session()
+        try:
+            return session.query(Product).filter(Product.sku == sku).all()
         finally:
             session.close()
     
@@ -177,12 +675,26 @@ class DatabaseManager:
             session.close()
     
     def update_product_field(self, product_id, field_name, value):
+        """Apply a local edit and record it as a pending change.
+        
+        The first edit of a field keeps the previously synced value as the
+        baseline; editing a field back to its baseline drops the change.
+        """
         session = self.get_session()
         try:
             product = session.query(Product).filter_by(woo_id=product_id).first()
             if product:
+                change = next((c for c in product.changes if c.field_name == field_name), None)
+                if change is None:
+                    change = ProductChange(field_name=field_name, baseline_value=getattr(product, field_name))
+                    product.changes.append(change)
+                change.edited_at = datetime.now()
+                if value == change.baseline_value:
+                    product.changes.remove(change)
+                
                 setattr(product, field_name, value)
-                product.last_synced = datetime.now()
+                product.dirty = bool(product.changes)
+                product.content_hash = None  # No longer the values last fetched from WooCommerce
                 session.commit()
                 return True
             return False
@@ -193,16 +705,219 @@ class DatabaseManager:
             session.close()
     
     def update_product_sync_time(self, woo_id):
+        return self.mark_products_synced([woo_id]) > 0
+    
+    def get_pending_changes(self):
+        """Return the unpushed local edits, one entry per dirty product.
+        
+        Each entry is a dict with ``woo_id``, ``name``, ``edited_at`` (latest
+        edit) and ``changes`` mapping each edited field to its ``baseline``
+        and current ``value``.
+        """
         session = self.get_session()
         try:
-            product = session.query(Product).filter_by(woo_id=woo_id).first()
-            if product:
-                product.last_synced = datetime.now()
-                session.commit()
-                return True
-            return False
+            rows = session.query(ProductChange, Product).join(Product).filter(
+                Product.dirty.is_(True)
+            ).order_by(Product.woo_id, ProductChange.field_name).all()
+            
+            pending = {}
+            for change, product in rows:
+                entry = pending.setdefault(product.woo_id, {
+                    'woo_id': product.woo_id,
+                    'name': product.name,
+                    'edited_at': change.edited_at,
+                    'changes': {}
+                })
+                entry['edited_at'] = max(entry['edited_at'], change.edited_at)
+                entry['changes'][change.field_name] = {
+                    'baseline': change.baseline_value,
+                    'value': getattr(product, change.field_name)
+                }
+            return list(pending.values())
+        finally:
+            session.close()
+    
+    def count_pending_changes(self):
+        session = self.get_session()
+        try:
+            return session.query(Product).filter(Product.dirty.is_(True)).count()
+        finally:
+            session.close()
+    
+    def mark_products_synced(self, woo_ids):
+        """Clear pending changes and bump last_synced for many products in one transaction.
+        
+        The content hash is dropped too: the pushed values are not the payload
+        it was computed from, so the next fetch must rewrite the products.
+        """
+        woo_ids = list(woo_ids)
+        if not woo_ids:
+            return 0
+        session = self.get_session()
+        try:
+            updated = session.query(Product).filter(Product.woo_id.in_(woo_ids)).update(
+                {Product.dirty: False, Product.content_hash: None, Product.last_synced: datetime.now()},
+                synchronize_session=False
+            )
+            self._clear_changes(session, woo_ids)
+            session.commit()
+            return updated
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_sync_watermark(self, store_url):
+        session = self.get_session()
+        try:
+            state = session.query(SyncState).filter_by(store_url=store_url).first()
+            return state.last_modified if state else None
+        finally:
+            session.close()
+    
+    def update_sync_watermark(self, store_url, last_modified):
+        """Advance the store's high-water mark; it never moves backwards."""
+        session = self.get_session()
+        try:
+            state = session.query(SyncState).filter_by(store_url=store_url).first()
+            if not state:
+                state = SyncState(store_url=store_url)
+                session.add(state)
+            
+            if last_modified and (state.last_modified is None or last_modified > state.last_modified):
+                state.last_modified = last_modified
+            state.last_sync = datetime.now()
+            session.commit()
+            return state.last_modified
         except Exception as e:
             session.rollback()
             raise e
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+    
+    def start_sync_run(self, store_url, mode, per_page, modified_after=None, resume_since=None):
+        """Open a fetch run, resuming the store's unfinished one when possible.
+        
+        The newest run of the same store, mode and page size that did not
+        complete and started after ``resume_since`` is reopened; without
+        ``resume_since`` a new run always starts. Other unfinished runs of
+        the store and mode are marked abandoned. Returns a SyncCheckpoint.
+        """
+        session = self.get_session()
+        try:
+            unfinished = session.query(SyncRun).filter(
+                SyncRun.store_url == store_url, SyncRun.mode == mode,
+                SyncRun.status.in_(('running', 'interrupted'))
+            ).order_by(SyncRun.started_at.desc(), SyncRun.id.desc()).all()
+            
+            run = None
+            if resume_since is not None and unfinished and unfinished[0].per_page == per_page \
+                    and unfinished[0].started_at >= resume_since:
+                run = unfinished.pop(0)
+            for stale in unfinished:
+                stale.status = 'abandoned'
+            
+            resumed = run is not None
+            if resumed:
+                run.status = 'running'
+                run.ended_at = None
+            else:
+                run = SyncRun(store_url=store_url, mode=mode, per_page=per_page, modified_after=modified_after,
+                              started_at=datetime.now())
+                session.add(run)
+            session.flush()
+            
+            completed_pages = {page for page, in session.query(SyncRunPage.page).filter(
+                SyncRunPage.run_id == run.id, SyncRunPage.status == 'completed')}
+            store_started_at = run.store_started_at
+            if resumed and store_started_at is None:
+                # Run recorded before store_started_at existed, started_at is local time
+                store_started_at = run.started_at.astimezone(timezone.utc).replace(tzinfo=None)
+            checkpoint = SyncCheckpoint(run.id, resumed, run.modified_after, completed_pages, run.latest_modified,
+                                        store_started_at)
+            session.commit()
+            return checkpoint
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def create_sync_run(self, store_url, mode, per_page):
+        """Record the start of a sync run that is never resumed, such as a push. Returns its id."""
+        session = self.get_session()
+        try:
+            run = SyncRun(store_url=store_url, mode=mode, per_page=per_page, started_at=datetime.now())
+            session.add(run)
+            session.commit()
+            return run.id
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def record_sync_pages(self, run_id, pages, status='completed', error=None, latest_modified=None):
+        """Mark pages of a sync run completed or failed, advancing its latest_modified."""
+        pages = list(pages)
+        session = self.get_session()
+        try:
+            if pages:
+                statement = sqlite_insert(SyncRunPage).values(
+                    [{'run_id': run_id, 'page': page, 'status': status, 'error': error} for page in pages]
+                )
+                session.execute(statement.on_conflict_do_update(
+                    index_elements=['run_id', 'page'],
+                    set_={'status': statement.excluded.status, 'error': statement.excluded.error}
+                ))
+            if latest_modified:
+                session.query(SyncRun).filter(
+                    SyncRun.id == run_id,
+                    or_(SyncRun.latest_modified.is_(None), SyncRun.latest_modified < latest_modified)
+                ).update({SyncRun.latest_modified: latest_modified}, synchronize_session=False)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def update_sync_run(self, run_id, **values):
+        """Set columns of a sync run, e.g. ``total_pages`` or ``status`` and ``ended_at``."""
+        session = self.get_session()
+        try:
+            session.query(SyncRun).filter(SyncRun.id == run_id).update(
+                {getattr(SyncRun, column): value for column, value in values.items()},
+                synchronize_session=False
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def record_sync_metrics(self, run_id, metrics):
+        """Store the metrics of an attempt of a sync run, keyed by ``sync_runs`` column."""
+        self.update_sync_run(run_id, **{
+            column: func.coalesce(getattr(SyncRun, column), 0) + value if column in SYNC_RUN_COUNTERS else value
+            for column, value in metrics.items()
+        })
+    
+    def get_sync_runs(self, limit=20, store_url=None):
+        """Return the newest sync runs as dicts of their columns, plus ``pages_per_second``."""
+        session = self.get_session()
+        try:
+            query = session.query(SyncRun)
+            if store_url:
+                query = query.filter(SyncRun.store_url == store_url)
+            runs = []
+            for run in query.order_by(SyncRun.started_at.desc(), SyncRun.id.desc()).limit(limit):
+                values = {column.key: getattr(run, column.key) for column in SyncRun.__table__.columns}
+                values['pages_per_second'] = (run.pages_fetched / run.duration_seconds
+                                              if run.pages_fetched and run.duration_seconds else None)
+                runs.append(values)
+            return runs
+        finally:
+            session.close()
@@ -0,0 +1,83 @@
+import logging
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s %(levelname)-7s %(name)s [%(threadName)s] %(message)s'
+LOG_FILE = 'sync_app.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# Pass as ``extra`` for events logged once per row, page or click; they go
+# through RateLimitFilter so a debug run stays readable and fast.
+SAMPLED = {'sampled': True}
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most ``rate`` sampled records per second per call site.
+
+    Records without the ``sampled`` flag always pass. The first record let
+    through after some were dropped reports how many were suppressed.
+    """
+
+    def __init__(self, rate=5):
+        super().__init__()
+        self.rate = rate
+        self._windows = {}  # (logger, line) -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not getattr(record, 'sampled', False):
+            return True
+        if hasattr(record, 'rate_limited'):
+            return not record.rate_limited  # Already decided by another handler
+        record.rate_limited = not self._allow(record)
+        return not record.rate_limited
+
+    def _allow(self, record):
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.setdefault((record.name, record.lineno), [now, 0, 0])
+            if now - window[0] >= 1:
+                window[0], window[1] = now, 0
+            if window[1] >= self.rate:
+                window[2] += 1
+                return False
+            window[1] += 1
+            suppressed, window[2] = window[2], 0
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+def setup_logging(level='INFO', log_file=LOG_FILE, sample_rate=5):
+    """Configure the root logger with console output and a rotating log file.
+
+    ``level`` is a level name or number, ``log_file`` may be None to log to
+    the console only and ``sample_rate`` caps sampled debug records per
+    second per call site. Calling it again replaces the previous handlers.
+    """
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                            encoding='utf-8'))
+    rate_limit = RateLimitFilter(sample_rate)
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        handler.addFilter(rate_limit)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+    # SQLAlchemy and urllib3 are chatty at debug level
+    for name in ('sqlalchemy', 'urllib3', 'alembic'):
+        logging.getLogger(name).setLevel(max(level, logging.WARNING))
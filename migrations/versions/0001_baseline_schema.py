@@ -0,0 +1,104 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases created before migrations were introduced already contain
+    # some of these tables, so only create what is missing
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if 'products' not in tables:
+        op.create_table(
+            'products',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('woo_id', sa.Integer(), nullable=True),
+            sa.Column('name', sa.String(), nullable=True),
+            sa.Column('sku', sa.String(), nullable=True),
+            sa.Column('regular_price', sa.Float(), nullable=True),
+            sa.Column('sale_price', sa.Float(), nullable=True),
+            sa.Column('stock_quantity', sa.Integer(), nullable=True),
+            sa.Column('categories', sa.String(), nullable=True),
+            sa.Column('last_synced', sa.DateTime(), nullable=True),
+            sa.Column('dirty', sa.Boolean(), server_default=sa.false(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('woo_id')
+        )
+    elif 'dirty' not in {column['name'] for column in inspector.get_columns('products')}:
+        op.add_column('products', sa.Column('dirty', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    if 'vendors' not in tables:
+        op.create_table(
+            'vendors',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(), nullable=True),
+            sa.Column('api_url', sa.String(), nullable=True),
+            sa.Column('api_key', sa.String(), nullable=True),
+            sa.Column('api_secret', sa.String(), nullable=True),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('last_sync', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name')
+        )
+
+    if 'vendor_stocks' not in tables:
+        op.create_table(
+            'vendor_stocks',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('product_id', sa.Integer(), nullable=True),
+            sa.Column('vendor_id', sa.Integer(), nullable=True),
+            sa.Column('stock_quantity', sa.Integer(), nullable=True),
+            sa.Column('price', sa.Float(), nullable=True),
+            sa.Column('last_updated', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+            sa.ForeignKeyConstraint(['vendor_id'], ['vendors.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'product_changes' not in tables:
+        op.create_table(
+            'product_changes',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('product_id', sa.Integer(), nullable=False),
+            sa.Column('field_name', sa.String(), nullable=False),
+            sa.Column('baseline_value', sa.JSON(), nullable=True),
+            sa.Column('edited_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('product_id', 'field_name')
+        )
+
+    if 'sync_state' not in tables:
+        op.create_table(
+            'sync_state',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('store_url', sa.String(), nullable=True),
+            sa.Column('last_modified', sa.DateTime(), nullable=True),
+            sa.Column('last_sync', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('store_url')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('sync_state')
+    op.drop_table('product_changes')
+    op.drop_table('vendor_stocks')
+    op.drop_table('vendors')
+    op.drop_table('products')
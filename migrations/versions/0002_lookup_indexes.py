@@ -0,0 +1,40 @@
+"""lookup indexes and unique vendor stock per product
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_sku', 'products', ['sku'])
+    # Partial index, only the few locally edited rows are stored in it
+    op.create_index('ix_products_dirty', 'products', ['dirty'], sqlite_where=sa.text('dirty'))
+
+    # Keep the most recently written row of any duplicated vendor stock
+    # before enforcing one row per (product, vendor)
+    op.execute(
+        'DELETE FROM vendor_stocks WHERE id NOT IN '
+        '(SELECT MAX(id) FROM vendor_stocks GROUP BY product_id, vendor_id)'
+    )
+    op.create_index('ix_vendor_stocks_product_vendor', 'vendor_stocks', ['product_id', 'vendor_id'], unique=True)
+    op.create_index('ix_vendor_stocks_vendor_id', 'vendor_stocks', ['vendor_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vendor_stocks_vendor_id', table_name='vendor_stocks')
+    op.drop_index('ix_vendor_stocks_product_vendor', table_name='vendor_stocks')
+    op.drop_index('ix_products_dirty', table_name='products')
+    op.drop_index('ix_products_sku', table_name='products')
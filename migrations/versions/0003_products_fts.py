@@ -0,0 +1,64 @@
+"""full-text search index over products
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # External content table: the text lives in products, the index only
+    # stores tokens. Prefix indexes make search-as-you-type prefix queries cheap.
+    op.execute(
+        "CREATE VIRTUAL TABLE products_fts USING fts5("
+        "name, sku, categories, "
+        "content='products', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')"
+    )
+    # Rank name matches above SKU and category matches
+    op.execute("INSERT INTO products_fts(products_fts, rank) VALUES('rank', 'bm25(10.0, 5.0, 1.0)')")
+
+    op.execute(
+        "CREATE TRIGGER products_fts_ai AFTER INSERT ON products BEGIN "
+        "INSERT INTO products_fts(rowid, name, sku, categories) "
+        "VALUES (new.id, new.name, new.sku, new.categories); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER products_fts_ad AFTER DELETE ON products BEGIN "
+        "INSERT INTO products_fts(products_fts, rowid, name, sku, categories) "
+        "VALUES ('delete', old.id, old.name, old.sku, old.categories); "
+        "END"
+    )
+    # Syncs rewrite the text columns of every fetched product, only reindex real changes
+    op.execute(
+        "CREATE TRIGGER products_fts_au AFTER UPDATE OF name, sku, categories ON products "
+        "WHEN old.name IS NOT new.name OR old.sku IS NOT new.sku OR old.categories IS NOT new.categories "
+        "BEGIN "
+        "INSERT INTO products_fts(products_fts, rowid, name, sku, categories) "
+        "VALUES ('delete', old.id, old.name, old.sku, old.categories); "
+        "INSERT INTO products_fts(rowid, name, sku, categories) "
+        "VALUES (new.id, new.name, new.sku, new.categories); "
+        "END"
+    )
+
+    op.execute("INSERT INTO products_fts(products_fts) VALUES('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+    op.execute("DROP TABLE IF EXISTS products_fts")
@@ -0,0 +1,36 @@
+"""indexes for sorting the product list
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite appends the rowid to every index, so each of these also covers
+    # the (column, id) order used by keyset pagination
+    op.create_index('ix_products_name_nocase', 'products', [sa.text('name COLLATE NOCASE')])
+    op.create_index('ix_products_regular_price', 'products', ['regular_price'])
+    op.create_index('ix_products_sale_price', 'products', ['sale_price'])
+    op.create_index('ix_products_stock_quantity', 'products', ['stock_quantity'])
+    op.create_index('ix_products_last_synced', 'products', ['last_synced'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_last_synced', table_name='products')
+    op.drop_index('ix_products_stock_quantity', table_name='products')
+    op.drop_index('ix_products_sale_price', table_name='products')
+    op.drop_index('ix_products_regular_price', table_name='products')
+    op.drop_index('ix_products_name_nocase', table_name='products')
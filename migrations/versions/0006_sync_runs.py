@@ -0,0 +1,53 @@
+"""checkpointed sync runs
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('store_url', sa.String(), nullable=False),
+        sa.Column('mode', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('per_page', sa.Integer(), nullable=False),
+        sa.Column('modified_after', sa.String(), nullable=True),
+        sa.Column('total_pages', sa.Integer(), nullable=True),
+        sa.Column('latest_modified', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('ended_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_runs_store_url_mode', 'sync_runs', ['store_url', 'mode'])
+    op.create_table(
+        'sync_run_pages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('page', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['run_id'], ['sync_runs.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('run_id', 'page')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sync_run_pages')
+    op.drop_index('ix_sync_runs_store_url_mode', table_name='sync_runs')
+    op.drop_table('sync_runs')
@@ -0,0 +1,51 @@
+"""sync run metrics
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 19:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRIC_COLUMNS = (
+    ('products_total', sa.Integer()),
+    ('products_processed', sa.Integer()),
+    ('products_inserted', sa.Integer()),
+    ('products_updated', sa.Integer()),
+    ('products_unchanged', sa.Integer()),
+    ('products_failed', sa.Integer()),
+    ('pages_fetched', sa.Integer()),
+    ('failed_pages', sa.Integer()),
+    ('failed_chunks', sa.Integer()),
+    ('requests', sa.Integer()),
+    ('bytes_received', sa.Integer()),
+    ('latency_p50_ms', sa.Float()),
+    ('latency_p95_ms', sa.Float()),
+    ('latency_max_ms', sa.Float()),
+    ('write_seconds', sa.Float()),
+    ('queue_wait_seconds', sa.Float()),
+    ('fetch_wait_seconds', sa.Float()),
+    ('duration_seconds', sa.Float()),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('sync_runs') as batch_op:
+        for name, type_ in METRIC_COLUMNS:
+            batch_op.add_column(sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sync_runs') as batch_op:
+        for name, _ in reversed(METRIC_COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,29 @@
+"""store clock at the start of a sync run
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing unfinished runs fall back to their local started_at when resumed
+    with op.batch_alter_table('sync_runs') as batch_op:
+        batch_op.add_column(sa.Column('store_started_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sync_runs') as batch_op:
+        batch_op.drop_column('store_started_at')
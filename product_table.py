@@ -0,0 +1,136 @@
+import threading
+from collections import OrderedDict
+
+from database import FIRST_PAGE
+
+TVA_RATE = 1.19
+
+def format_product_rows(rows, with_tva=False):
+    """Turn ProductRow tuples into table values, missing values shown as N/A."""
+    factor = TVA_RATE if with_tva else 1.0
+    return [
+        (woo_id, name, sku,
+         'N/A' if regular_price is None else f"{regular_price * factor:.2f}",
+         'N/A' if sale_price is None else f"{sale_price * factor:.2f}",
+         'N/A' if stock_quantity is None else stock_quantity,
+         last_synced or 'N/A')
+        for woo_id, name, sku, regular_price, sale_price, stock_quantity, last_synced in rows
+    ]
+
+class ProductTableModel:
+    """Windowed view of the product listing for a virtually scrolled table.
+
+    Rows are addressed by their index in the current listing (search term,
+    sort column and direction) and loaded from the database in fixed-size
+    blocks, located with keyset cursors. Only the most recently used blocks
+    are kept, so scrolling through a large catalog never holds more than a
+    few hundred products in memory.
+
+    Loading methods run database queries and are meant to be called from a
+    worker thread; ``row`` and ``missing_blocks`` only read the cache.
+    """
+
+    def __init__(self, db, block_size=100, max_blocks=20):
+        self.db = db
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.search_term = None
+        self.sort_by = None
+        self.descending = False
+        self.total = 0
+        self._blocks = OrderedDict()  # Block index -> products, least recently used first
+        self._cursors = {0: FIRST_PAGE}  # Block index -> cursor of the row before the block
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def query(self):
+        return self.search_term, self.sort_by, self.descending
+
+    def row(self, index):
+        """Return the ProductRow at ``index`` if its block is loaded, else None."""
+        block_index, offset = divmod(index, self.block_size)
+        with self._lock:
+            block = self._blocks.get(block_index)
+            if block is None:
+                return None
+            self._blocks.move_to_end(block_index)
+            return block[offset] if offset < len(block) else None
+
+    def missing_blocks(self, start, count):
+        """Indexes of the blocks covering rows ``start`` to ``start + count`` that are not loaded."""
+        end = min(start + count, self.total)
+        if end <= start:
+            return []
+        first = start // self.block_size
+        last = (end - 1) // self.block_size
+        with self._lock:
+            return [index for index in range(first, last + 1) if index not in self._blocks]
+
+    def refresh(self, start, count, search_term=None, sort_by=None, descending=False):
+        """Reload the listing and the rows ``start`` to ``start + count``.
+
+        Everything is fetched before the cache is swapped, so the table keeps
+        showing the previous rows until the new ones are ready. Returns the
+        new total, which callers use to clamp their scroll position.
+        """
+        total = self.db.count_products(search_term)
+        start = max(0, min(start, total - count))
+        blocks = OrderedDict()
+        cursors = {0: FIRST_PAGE}
+        if total:
+            first = start // self.block_size
+            last = (min(start + count, total) - 1) // self.block_size
+            for block_index in range(first, last + 1):
+                self._fetch_block(block_index, blocks, cursors, search_term, sort_by, descending)
+
+        with self._lock:
+            self._generation += 1
+            self.search_term = search_term
+            self.sort_by = sort_by
+            self.descending = descending
+            self.total = total
+            self._blocks = blocks
+            self._cursors = cursors
+        return total
+
+    def load_block(self, block_index):
+        """Load one block into the cache, unless the listing changed meanwhile."""
+        with self._lock:
+            generation = self._generation
+            search_term, sort_by, descending = self.query()
+            cursors = dict(self._cursors)
+
+        blocks = OrderedDict()
+        self._fetch_block(block_index, blocks, cursors, search_term, sort_by, descending)
+
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._blocks.update(blocks)
+            self._blocks.move_to_end(block_index)
+            self._cursors.update(cursors)
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+            return True
+
+    def _fetch_block(self, block_index, blocks, cursors, search_term, sort_by, descending):
+        cursor = cursors.get(block_index)
+        if cursor is None:
+            # Seek from the nearest known block before this one
+            known = max(index for index in cursors if index < block_index)
+            cursor = self.db.skip_cursor(search_term, cursors[known], (block_index - known) * self.block_size,
+                                         sort_by=sort_by, descending=descending)
+            if cursor is None:
+                blocks[block_index] = []
+                return
+            cursors[block_index] = cursor
+
+        page = self.db.search_products_page(search_term=search_term, limit=self.block_size, after=cursor,
+                                            sort_by=sort_by, descending=descending, as_rows=True)
+        blocks[block_index] = page.products
+        if page.next_cursor is not None:
+            cursors[block_index + 1] = page.next_cursor
@@ -1,18 +1,19 @@
 import sys
 import os
+import logging
 import tkinter as tk
 import threading
 from tkinter import ttk, messagebox
-import requests
 from dotenv import load_dotenv, set_key
-from functools import partial
-from database import DatabaseManager
-from tqdm import tqdm
 import json
-import webbrowser
-from database import DatabaseManager, Product
-import queue
+from sync_engine import (STATS_COLUMNS, CancellationToken, SyncEngine, SyncError, create_client, env_credentials,
+                         fetch_settings, format_sync_runs, load_config)
 import time
+from concurrent.futures import ThreadPoolExecutor
+from logging_config import LOG_FILE, SAMPLED, setup_logging
+from ui_bridge import UiBridge
+
+logger = logging.getLogger(__name__)
 
 class SettingsDialog:
     def __init__(self, app):
@@ -122,252 +123,303 @@ class SettingsDialog:
         self.dialog.destroy()
 
 class SyncApp:
+    SEARCH_DEBOUNCE_MS = 250
+    
+    # Database column behind each sortable product list column
+    SORT_COLUMNS = {
+        'ID': 'woo_id',
+        'Name': 'name',
+        'SKU': 'sku',
+        'Regular Price': 'regular_price',
+        'Sale Price': 'sale_price',
+        'Stock': 'stock_quantity',
+        'Last Synced': 'last_synced'
+    }
+    
     def sort_treeview(self, col):
-        # Get all items in the treeview
-        items = [(self.tree.set(item, col), item) for item in self.tree.get_children('')]
+        """Sort the whole catalog by a column through the database.
         
-        if not items:
-            return
-        
-        # Determine if the column should be sorted numerically
-        numeric_columns = {'Regular Price', 'Sale Price', 'Stock'}
-        is_numeric = col in numeric_columns
-        
-        # Sort items based on column type
-        if is_numeric:
-            # For numeric columns, handle 'N/A' and None values
-            def numeric_sort_key(x):
-                val = x[0]
-                if val in ('N/A', 'None', ''):
-                    return float('-inf')
-                try:
-                    return float(val)
-                except ValueError:
-                    return float('-inf')
-            
-            items.sort(key=numeric_sort_key, reverse=getattr(self, 'sort_reverse', False))
+        Clicking a new column sorts ascending, clicking it again reverses the
+        order. Empty values (N/A) come first ascending and last descending.
+        """
+        if self.sort_column == col:
+            self.sort_reverse = not self.sort_reverse
         else:
-            # For text columns, use case-insensitive string comparison
-            items.sort(key=lambda x: x[0].lower() if isinstance(x[0], str) and x[0] not in ('N/A', 'None') else '',
-            reverse=getattr(self, 'sort_reverse', False))
-        
-        # Rearrange items in sorted positions
-        for index, (val, item) in enumerate(items):
-            self.tree.move(item, '', index)
-            # Maintain link style for ID column
-            if col != 'ID' and self.tree.set(item, 'ID') != 'N/A':
-                self.tree.item(item, tags=('link',))
-        
-        # Reverse sort next time
-        self.sort_reverse = not getattr(self, 'sort_reverse', False)
+            self.sort_column = col
+            self.sort_reverse = False
         
         # Update column headers to show sort direction
         for column in self.tree['columns']:
             self.tree.heading(column, text=column)
         self.tree.heading(col, text=f"{col} {'↓' if self.sort_reverse else '↑'}")
-
-    def update_product_list(self, filtered_products=None):
-        print("\nUpdating product list in UI...")
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Get products from database with pagination
-        page = getattr(self, 'current_page', 0)
-        per_page = 50
-        offset = page * per_page
-        
-        if filtered_products is not None:
-            products_to_display = filtered_products[offset:offset + per_page]
-            total_products = len(filtered_products)
-        else:
-            search_term = self.search_var.get() if hasattr(self, 'search_var') else None
-            products_to_display = self.db.search_products(search_term=search_term, limit=per_page, offset=offset)
-            total_products = self.db.get_total_products()
         
-        print(f"Number of products to display: {len(products_to_display)}")
-        
-        # Add items
-        products_added = 0
-        for product in products_to_display:
+        self.view_top = 0
+        self.update_product_list()
+
+    def update_product_list(self, select_woo_id=None):
+        """Reload the product list, keeping the current scroll position.
+        
+        The listing is refreshed on the query worker and only the newest
+        request is rendered, results of superseded requests are dropped.
+        Searching and sorting start from the top by resetting ``view_top``.
+        """
+        self.list_generation += 1
+        generation = self.list_generation
+        if select_woo_id is not None:
+            self.selected_woo_id = select_woo_id
+        
+        search_term = self.search_var.get() if hasattr(self, 'search_var') else None
+        sort_by = self.SORT_COLUMNS.get(self.sort_column)
+        descending = self.sort_reverse
+        top = self.view_top
+        visible = len(self.row_items)
+        
+        def load():
+            if generation != self.list_generation or self.product_model is None:
+                return  # A newer request was made while this one waited, or there is no database
             try:
-                # Format price with currency if available
-                regular_price = product.regular_price if isinstance(product, Product) else product.get('regular_price')
-                sale_price = product.sale_price if isinstance(product, Product) else product.get('sale_price')
-                
-                if regular_price is not None:
-                    try:
-                        # Extract numeric value from SQLAlchemy Column or direct value
-                        if hasattr(regular_price, 'value'):
-                            price_value = float(str(regular_price.value))
-                        else:
-                            price_value = float(str(regular_price))
-                        
-                        if self.show_tva_var.get():
-                            price_value = price_value * 1.19
-                        regular_price = f"{price_value:.2f}"
-                    except (ValueError, TypeError, AttributeError):
-                        regular_price = 'N/A'
-                else:
-                    regular_price = 'N/A'
-                
-                if sale_price is not None:
-                    try:
-                        # Extract numeric value from SQLAlchemy Column or direct value
-                        if hasattr(sale_price, 'value'):
-                            price_value = float(str(sale_price.value))
-                        else:
-                            price_value = float(str(sale_price))
-                            
-                        if self.show_tva_var.get():
-                            price_value = price_value * 1.19
-                        sale_price = f"{price_value:.2f}"
-                    except (ValueError, TypeError, AttributeError):
-                        sale_price = 'N/A'
-                else:
-                    sale_price = 'N/A'
-                
-                woo_id = product.woo_id if isinstance(product, Product) else product.get('id', 'N/A')
-                name = product.name if isinstance(product, Product) else product.get('name', 'N/A')
-                sku = product.sku if isinstance(product, Product) else product.get('sku', 'N/A')
-                stock = product.stock_quantity if isinstance(product, Product) else product.get('stock_quantity', 'N/A')
-                
-                # Format last_synced timestamp
-                last_synced = product.last_synced if isinstance(product, Product) else product.get('last_synced', 'N/A')
-                if last_synced != 'N/A':
-                    last_synced = last_synced.strftime('%Y-%m-%d %H:%M')
-                
-                values = (woo_id, name, sku, regular_price, sale_price, stock, last_synced)
-                print(f"Adding product: {values}")
-                
-                item = self.tree.insert("", tk.END, values=values)
-                if str(woo_id) != 'N/A':
-                    self.tree.item(item, tags=('link',))
-                products_added += 1
-            except Exception as e:
-                print(f"Error adding product to list: {str(e)}")
-                print(f"Problematic product data: {product}")
-                continue
-        
-        # Update pagination controls
-        total_pages = (total_products + per_page - 1) // per_page
-        
-        # Update button states
-        self.prev_page_btn.config(state=tk.NORMAL if page > 0 else tk.DISABLED)
-        self.next_page_btn.config(state=tk.NORMAL if page < total_pages - 1 else tk.DISABLED)
-        
-        # Update page counter
-        self.page_counter_label.config(text=f"Page {page + 1} of {total_pages}")
+                self.product_model.refresh(top, visible, search_term=search_term, sort_by=sort_by,
+                                           descending=descending)
+            except Exception:
+                logger.exception("Error loading products")
+                return
+            self.ui.post(self.render_product_list, generation)
         
-        # Update jump buttons
-        jumps = [-50, -25, -10, 10, 25, 50]
-        for jump in jumps:
-            target_page = page + jump
-            self.jump_buttons[jump].config(state=tk.NORMAL if 0 <= target_page < total_pages else tk.DISABLED)
+        self.query_executor.submit(load)
+    
+    def render_product_list(self, generation):
+        if generation != self.list_generation:
+            return  # Stale result
+        self.render_visible_rows()
+    
+    def render_visible_rows(self):
+        """Show the rows from ``view_top`` in the fixed set of table items.
+        
+        Rows whose block is not cached yet are shown as placeholders and
+        their blocks are requested from the query worker.
+        """
+        from product_table import format_product_rows
+        
+        model = self.product_model
+        if model is None:
+            return  # The database is still opening
+        if self.edit_widget is not None:
+            # The cell being edited may now show another product
+            self.edit_widget.destroy()
+            self.edit_widget = None
+        total = model.total
+        self.view_top = max(0, min(self.view_top, total - len(self.row_items)))
+        
+        rows = [model.row(self.view_top + offset) for offset in range(len(self.row_items))]
+        loaded = [row for row in rows if row is not None]
+        formatted = iter(format_product_rows(loaded, self.show_tva_var.get()))
+        
+        selected = []
+        for offset, (item, row) in enumerate(zip(self.row_items, rows)):
+            if row is None:
+                # Empty ID marks rows that can't be edited or synced
+                values = ('', 'Loading...' if self.view_top + offset < total else '', '', '', '', '', '')
+                self.tree.item(item, values=values, tags=())
+                continue
+            self.tree.item(item, values=next(formatted), tags=('link',))
+            if row.woo_id == self.selected_woo_id:
+                selected.append(item)
+        self.tree.selection_set(selected)
+        
+        shown = min(len(self.row_items), total - self.view_top)
+        if total:
+            self.range_label.config(text=f"Showing {self.view_top + 1}–{self.view_top + shown} of {total}")
+        else:
+            self.range_label.config(text="No products")
+        if total > len(self.row_items):
+            self.scrollbar.set(self.view_top / total, (self.view_top + shown) / total)
+        else:
+            self.scrollbar.set(0, 1)
         
-        print(f"Successfully added {products_added} products to the UI")
+        for block_index in model.missing_blocks(self.view_top, len(self.row_items)):
+            key = (model.generation, block_index)
+            if key not in self.pending_blocks:
+                self.pending_blocks.add(key)
+                self.query_executor.submit(self.load_block, key)
+    
+    def load_block(self, key):
+        generation, block_index = key
+        model = self.product_model
+        loaded = False
+        # Skip blocks scrolled past while the request waited
+        if generation == model.generation and block_index in model.missing_blocks(self.view_top, len(self.row_items)):
+            try:
+                loaded = model.load_block(block_index)
+                logger.debug("Loaded product block %d", block_index, extra=SAMPLED)
+            except Exception:
+                logger.exception("Error loading product block %d", block_index)
+        self.ui.post(self.block_loaded, key, loaded)
+    
+    def block_loaded(self, key, loaded):
+        self.pending_blocks.discard(key)
+        if loaded:
+            self.render_visible_rows()
+    
+    def scroll_to(self, top):
+        if self.product_model is None:
+            return
+        top = max(0, min(int(top), self.product_model.total - len(self.row_items)))
+        if top == self.view_top:
+            return
+        self.view_top = top
+        self.render_visible_rows()
+    
+    def on_scrollbar(self, action, amount, unit=None):
+        if self.product_model is None:
+            return
+        if action == 'moveto':
+            self.scroll_to(float(amount) * self.product_model.total)
+        elif unit == 'pages':
+            self.scroll_to(self.view_top + int(amount) * max(1, len(self.row_items) - 1))
+        else:
+            self.scroll_to(self.view_top + int(amount))
+    
+    def on_mouse_wheel(self, event):
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self.scroll_to(self.view_top + step)
+        return 'break'
+    
+    def on_tree_key(self, event):
+        # Scroll when the keyboard moves past the first or last visible row
+        focus = self.tree.focus()
+        if event.keysym == 'Prior':
+            self.on_scrollbar('scroll', -1, 'pages')
+        elif event.keysym == 'Next':
+            self.on_scrollbar('scroll', 1, 'pages')
+        elif event.keysym == 'Up' and focus == self.row_items[0]:
+            self.scroll_to(self.view_top - 1)
+        elif event.keysym == 'Down' and focus == self.row_items[-1]:
+            self.scroll_to(self.view_top + 1)
+        else:
+            return None
+        return 'break'
+    
+    def on_tree_select(self, event):
+        # Remember the product, not the table row, so the selection follows scrolling
+        for item in self.tree.selection():
+            woo_id = self.tree.item(item)['values'][0]
+            if woo_id != '':
+                self.selected_woo_id = woo_id
+                return
+    
+    def on_tree_configure(self, event):
+        # Keep one table item per row that fits in the widget
+        bbox = self.tree.bbox(self.row_items[0])
+        if not bbox:
+            return
+        rows = max(1, (event.height - bbox[1]) // bbox[3])
+        if rows == len(self.row_items):
+            return
+        while len(self.row_items) < rows:
+            self.row_items.append(self.tree.insert("", tk.END, values=('',) * 7))
+        while len(self.row_items) > rows:
+            self.tree.delete(self.row_items.pop())
+        self.render_visible_rows()
 
     def edit_product(self, product_id):
         messagebox.showinfo("Edit Product", f"Editing product {product_id}")
 
     def sync_product(self, woo_id):
-        try:
-            # Store the selected item before updating
-            selected_items = self.tree.selection()
-            
-            # Load API credentials
-            load_dotenv(override=True)
-            url = os.getenv('WOO_API_URL', '').rstrip('/')
-            key = os.getenv('WOO_API_KEY', '')
-            secret = os.getenv('WOO_API_SECRET', '')
-            
-            # Fetch product data from WooCommerce
-            response = requests.get(
-                f"{url}/wp-json/wc/v3/products/{woo_id}",
-                auth=(key, secret)
-            )
-            
-            if response.status_code == 200:
-                # Update local database with fetched data
-                product_data = response.json()
-                self.db.add_or_update_product(product_data)
-                self.status_label.config(text=f"Product {woo_id} synced from WooCommerce successfully", foreground="green")
-                
-                # Refresh the product list
-                self.update_product_list()
+        # Store the selected item before updating
+        selected_items = self.tree.selection()
+        self.status_label.config(text=f"Syncing product {woo_id} from WooCommerce...", foreground="")
+        
+        def pull_thread():
+            # The client's retries can sleep for minutes, keep them off the Tk thread
+            try:
+                # Replace the local product with the one in WooCommerce
+                self.get_sync_engine().pull_product(woo_id)
+                self.ui.post(self.status_label.config, text=f"Product {woo_id} synced from WooCommerce successfully",
+                             foreground="green")
                 
-                # Restore the selection
-                if selected_items:
-                    for item in self.tree.get_children():
-                        if self.tree.item(item)['values'][0] == woo_id:
-                            self.tree.selection_set(item)
-                            self.tree.see(item)
-                            break
-            else:
-                self.status_label.config(text=f"Failed to fetch product {woo_id}: {response.status_code}", foreground="red")
-        except Exception as e:
-            self.status_label.config(text=f"Error syncing product: {str(e)}", foreground="red")
-            print(f"Error syncing product: {str(e)}")
+                # Refresh the product list, restoring the selection
+                self.ui.post(self.update_product_list, select_woo_id=woo_id if selected_items else None)
+            except SyncError as e:
+                self.ui.post(self.status_label.config, text=str(e), foreground="red")
+            except Exception as e:
+                self.ui.post(self.status_label.config, text=f"Error syncing product: {str(e)}", foreground="red")
+                logger.exception("Error syncing product %s", woo_id)
+        
+        threading.Thread(target=pull_thread).start()
 
     def sync_to_woocommerce(self, woo_id):
-        try:
-            # Store the selected item before updating
-            selected_items = self.tree.selection()
-            
-            # Get the product data from the database
-            product = self.db.get_product_by_id(woo_id)
-            if not product:
-                self.status_label.config(text=f"Product {woo_id} not found in database", foreground="red")
-                return
-            
-            # Load API credentials
-            load_dotenv(override=True)
-            url = os.getenv('WOO_API_URL', '').rstrip('/')
-            key = os.getenv('WOO_API_KEY', '')
-            secret = os.getenv('WOO_API_SECRET', '')
-            
-            # Prepare the data to update
-            update_data = {
-                'regular_price': str(product.regular_price) if product.regular_price is not None else '',
-                'sale_price': str(product.sale_price) if product.sale_price is not None else '',
-                'stock_quantity': product.stock_quantity
-            }
-            
-            # Update product in WooCommerce
-            response = requests.put(
-                f"{url}/wp-json/wc/v3/products/{woo_id}",
-                auth=(key, secret),
-                json=update_data
-            )
-            
-            if response.status_code == 200:
-                self.status_label.config(text=f"Product {woo_id} updated in WooCommerce successfully", foreground="green")
-                # Update last_synced timestamp in database
-                self.db.update_product_sync_time(woo_id)
-                # Refresh the product list
-                self.update_product_list()
-                # Restore the selection
-                if selected_items:
-                    for item in self.tree.get_children():
-                        if self.tree.item(item)['values'][0] == woo_id:
-                            self.tree.selection_set(item)
-                            self.tree.see(item)
-                            break
-            else:
-                self.status_label.config(text=f"Failed to update product {woo_id}: {response.status_code}", foreground="red")
-        except Exception as e:
-            self.status_label.config(text=f"Error updating product: {str(e)}", foreground="red")
-            print(f"Error syncing product: {str(e)}")
+        # Store the selected item before updating
+        selected_items = self.tree.selection()
+        self.status_label.config(text=f"Updating product {woo_id} in WooCommerce...", foreground="")
+        
+        def push_thread():
+            try:
+                # Send the local prices and stock to WooCommerce
+                self.get_sync_engine().push_product(woo_id)
+                self.ui.post(self.status_label.config, text=f"Product {woo_id} updated in WooCommerce successfully",
+                             foreground="green")
+                
+                # Refresh the product list, restoring the selection
+                self.ui.post(self.update_product_list, select_woo_id=woo_id if selected_items else None)
+            except SyncError as e:
+                self.ui.post(self.status_label.config, text=str(e), foreground="red")
+            except Exception as e:
+                self.ui.post(self.status_label.config, text=f"Error updating product: {str(e)}", foreground="red")
+                logger.exception("Error updating product %s in WooCommerce", woo_id)
+        
+        threading.Thread(target=push_thread).start()
 
+    def push_dirty_products(self):
+        """Push all locally edited products to WooCommerce through products/batch."""
+        pending = self.db.count_pending_changes()
+        if not pending:
+            self.status_label.config(text="No local changes to push", foreground="green")
+            return
+        progress_dialog = ProgressDialog(self, pending, title="Pushing Products")
+        
+        def on_progress(done, total):
+            self.ui.post_latest(progress_dialog, progress_dialog.update_progress, done,
+                                f"Pushed {done} of {total} products")
+        
+        def push_thread():
+            try:
+                summary = self.get_sync_engine().push_changes(progress=on_progress,
+                                                              cancel=progress_dialog.cancel_token)
+            except Exception as e:
+                logger.exception("Error pushing products")
+                self.ui.post(self.status_label.config, text=f"Error pushing products: {str(e)}", foreground="red")
+                summary = None
+            finally:
+                self.ui.post(progress_dialog.close)
+            
+            if summary and summary['failures']:
+                pushed, failures = summary['pushed'], summary['failures']
+                self.ui.post(self.status_label.config, text=f"Pushed {len(pushed)} products, {len(failures)} failed",
+                             foreground="red")
+                details = "\n".join(f"{woo_id}: {error}" for woo_id, error in list(failures.items())[:20])
+                self.ui.post(messagebox.showerror, "Push Failed",
+                             f"{len(failures)} products could not be updated:\n\n{details}")
+            elif summary and summary['pushed']:
+                self.ui.post(self.status_label.config,
+                             text=f"Pushed {len(summary['pushed'])} products to WooCommerce successfully",
+                             foreground="green")
+            self.ui.post(self.update_product_list)
+        
+        push_thread_instance = threading.Thread(target=push_thread)
+        push_thread_instance.start()
+    
     def show_context_menu(self, event):
-        print(f"\nRight-click event detected at coordinates: ({event.x}, {event.y})")
         region = self.tree.identify('region', event.x, event.y)
-        print(f"Clicked region: {region}")
         if region == 'cell':
             column = self.tree.identify_column(event.x)
-            print(f"Clicked column: {column}")
+            logger.debug("Context menu at (%d, %d), column %s", event.x, event.y, column, extra=SAMPLED)
             item = self.tree.identify('item', event.x, event.y)
-            if item:
+            if item and self.tree.item(item)['values'][0] != '':  # Skip rows still loading
                 values = self.tree.item(item)['values']
                 product_id = values[0]  # WooCommerce ID
                 
@@ -387,7 +439,7 @@ class SyncApp:
                         base_url = self.url_input.get().rstrip('/')
                         product_url = f"{base_url}/?p={product_id}"
                         menu.add_command(label="Open in Browser",
-                                       command=lambda p=product_url: webbrowser.open(p))
+                                       command=lambda p=product_url: self.open_in_browser(p))
                     
                     if column == '#2' and product_id != 'N/A':  # Name column
                         menu.add_command(label="Sync from WooCommerce",
@@ -400,8 +452,8 @@ class SyncApp:
                     # Show menu at event coordinates if it has commands
                     if menu.index('end') is not None:
                         menu.tk_popup(event.x_root, event.y_root)
-                except Exception as e:
-                    print(f"Error showing context menu: {str(e)}")
+                except Exception:
+                    logger.exception("Error showing context menu")
 
     def on_motion(self, event):
         item = self.tree.identify('item', event.x, event.y)
@@ -424,8 +476,10 @@ class SyncApp:
         column = self.tree.identify_column(event.x)
         item = self.tree.identify('item', event.x, event.y)
         
-        if not item:
+        if not item or self.tree.item(item)['values'][0] == '':
             return
+        # Table items are reused for other products, so save against this one
+        product_id = self.tree.item(item)['values'][0]
             
         # Get column name
         col_id = int(column.replace('#', '')) - 1
@@ -453,15 +507,21 @@ class SyncApp:
         # Position the entry widget
         entry.place(x=bbox[0], y=bbox[1], width=bbox[2], height=bbox[3])
         
-        def on_entry_return(event):
-            self.save_edit(item, col_name, entry.get())
+        def close_entry():
             entry.destroy()
+            if self.edit_widget is entry:
+                self.edit_widget = None
+        
+        def on_entry_return(event):
+            value = entry.get()
+            close_entry()
+            self.save_edit(product_id, col_name, value)
             
         def on_entry_escape(event):
-            entry.destroy()
+            close_entry()
             
         def on_focus_out(event):
-            entry.destroy()
+            close_entry()
             
         entry.bind('<Return>', on_entry_return)
         entry.bind('<Escape>', on_entry_escape)
@@ -471,11 +531,9 @@ class SyncApp:
         # Store reference to prevent garbage collection
         self.edit_widget = entry
 
-    def save_edit(self, item, column, value):
+    def save_edit(self, product_id, column, value):
         try:
-            # Get the product ID from the first column
-            product_id = self.tree.item(item)['values'][0]
-            if product_id == 'N/A':
+            if product_id in ('', 'N/A'):
                 return
 
             # Validate and convert the value based on column type
@@ -501,18 +559,8 @@ class SyncApp:
             db_column = column_map[column]
             self.db.update_product_field(product_id, db_column, value)
 
-            # Update the tree view
-            values = list(self.tree.item(item)['values'])
-            col_id = self.tree['columns'].index(column)
-            # Format display value based on column type
-            if value is None:
-                display_value = 'N/A'
-            elif column in ('Regular Price', 'Sale Price'):
-                display_value = f"{value:.2f}"
-            else:
-                display_value = str(value)
-            values[col_id] = display_value
-            self.tree.item(item, values=values)
+            # Reload the cached rows so the table shows the new value
+            self.update_product_list()
 
             # Show success message
             self.status_label.config(text=f"{column} updated successfully", foreground="green")
@@ -520,37 +568,35 @@ class SyncApp:
             messagebox.showerror("Error", f"Failed to update {column.lower()}: {str(e)}")
 
     def filter_products(self, *args):
-        self.current_page = 0  # Reset to first page when searching
-        self.update_product_list()
+        # Coalesce keystrokes, only search once typing pauses
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(self.SEARCH_DEBOUNCE_MS, self.run_search)
     
-    def go_to_page(self, page):
-        self.current_page = page
-        self.update_product_list()
-        
-    def next_page(self):
-        self.current_page += 1
+    def run_search(self):
+        self.search_after_id = None
+        self.view_top = 0  # Show the best matches first
         self.update_product_list()
-        
-    def prev_page(self):
-        if self.current_page > 0:
-            self.current_page -= 1
-            self.update_product_list()
+
+    def open_in_browser(self, url):
+        import webbrowser
+        webbrowser.open(url)
 
     def copy_to_clipboard(self, value):
         self.root.clipboard_clear()
         self.root.clipboard_append(value)
         self.status_label.config(text=f"Value copied to clipboard", foreground="green")
 
+    def load_config(self):
+        return load_config()
+    
     def load_tva_preference(self):
-        try:
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-                return config.get('show_tva', True)
-        except FileNotFoundError:
-            return True
+        return self.load_config().get('show_tva', True)
     
     def save_tva_preference(self):
-        config = {'show_tva': self.show_tva_var.get()}
+        # Keep the other settings stored alongside the TVA flag
+        config = self.load_config()
+        config['show_tva'] = self.show_tva_var.get()
         with open('config.json', 'w') as f:
             json.dump(config, f)
     
@@ -559,13 +605,17 @@ class SyncApp:
         self.update_product_list()
     
     def __init__(self, root):
+        config = self.load_config()
+        setup_logging(config.get('log_level', 'INFO'), config.get('log_file', LOG_FILE),
+                      config.get('log_sample_rate', 5))
+        
         self.root = root
         self.root.title("WooCommerce Product Sync")
         self.root.geometry("1024x768")
         self.root.state("zoomed")
         
-        # Initialize database
-        self.db = DatabaseManager()
+        # The database is opened on the query worker once the window is up
+        self.db = None
         
         # Load API credentials from environment variables
         load_dotenv()
@@ -573,8 +623,25 @@ class SyncApp:
         self.key_input = tk.StringVar(value=os.getenv('WOO_API_KEY', ''))
         self.secret_input = tk.StringVar(value=os.getenv('WOO_API_SECRET', ''))
         
-        # Initialize pagination
-        self.current_page = 0
+        # Shared WooCommerce API client, created on first use
+        self.woo_client = None
+        self.woo_client_lock = threading.Lock()
+        
+        # Background threads update widgets only through the bridge
+        self.ui = UiBridge(root)
+        self.ui.start()
+        
+        # Product list is virtually scrolled, only the visible rows are loaded
+        self.product_model = None  # Created with the database
+        self.view_top = 0  # Index of the first visible row
+        self.selected_woo_id = None
+        self.edit_widget = None  # Entry of the cell being edited
+        
+        # Product list queries run on a single worker thread, newest request wins
+        self.query_executor = ThreadPoolExecutor(max_workers=1)
+        self.list_generation = 0
+        self.pending_blocks = set()  # (model generation, block index) requested from the worker
+        self.search_after_id = None
         
         # Configure style
         style = ttk.Style()
@@ -614,6 +681,15 @@ class SyncApp:
         self.fetch_button = ttk.Button(search_frame, text="Fetch Products", command=self.fetch_products)
         self.fetch_button.pack(side=tk.RIGHT, padx=5)
         
+        # Fetch only products changed since the last sync
+        self.fetch_changes_button = ttk.Button(search_frame, text="Fetch Changes",
+                                               command=lambda: self.fetch_products(incremental=True))
+        self.fetch_changes_button.pack(side=tk.RIGHT, padx=5)
+        
+        # Push locally edited products back to WooCommerce
+        self.push_button = ttk.Button(search_frame, text="Push Changes", command=self.push_dirty_products)
+        self.push_button.pack(side=tk.RIGHT, padx=5)
+        
         # Create table frame
         table_frame = ttk.Frame(main_container)
         table_frame.pack(fill=tk.BOTH, expand=True, pady=10)
@@ -621,10 +697,10 @@ class SyncApp:
         # Products table with sorting
         self.tree = ttk.Treeview(table_frame, columns=("ID", "Name", "SKU", "Regular Price", "Sale Price", "Stock", "Last Synced"), show="headings", height=20)
         
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        # The scrollbar moves through the whole listing, not the table items
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.row_items = [self.tree.insert("", tk.END, values=('',) * 7) for _ in range(20)]
         
         # Configure columns
         for col in self.tree["columns"]:
@@ -648,33 +724,12 @@ class SyncApp:
         
         self.tree.pack(fill=tk.BOTH, expand=True)
         
-        # Add pagination controls
+        # Listing position and display options
         pagination_frame = ttk.Frame(main_container)
         pagination_frame.pack(fill=tk.X, pady=5)
         
-        # Previous button
-        self.prev_page_btn = ttk.Button(pagination_frame, text="Previous", command=self.prev_page)
-        self.prev_page_btn.pack(side=tk.LEFT, padx=2)
-        
-        # Initialize jump buttons
-        self.jump_buttons = {}
-        jumps = [-50, -25, -10, 10, 25, 50]
-        
-        # Add jump buttons in order with page counter in the middle
-        for jump in jumps:
-            if jump == 10:
-                # Page counter
-                self.page_counter_label = ttk.Label(pagination_frame, text="Page 1 of 1", style="Page.TLabel")
-                self.page_counter_label.pack(side=tk.LEFT, padx=5)
-            
-            btn = ttk.Button(pagination_frame, text=f"{jump:+d}", 
-                            command=lambda j=jump: self.go_to_page(self.current_page + j))
-            btn.pack(side=tk.LEFT, padx=2)
-            self.jump_buttons[jump] = btn
-        
-        # Next button
-        self.next_page_btn = ttk.Button(pagination_frame, text="Next", command=self.next_page)
-        self.next_page_btn.pack(side=tk.LEFT, padx=2)
+        self.range_label = ttk.Label(pagination_frame, text="No products", style="Page.TLabel")
+        self.range_label.pack(side=tk.LEFT, padx=5)
         
         # TVA checkbox
         self.show_tva_var = tk.BooleanVar(value=self.load_tva_preference())
@@ -689,22 +744,50 @@ class SyncApp:
         self.tree.bind('<Motion>', self.on_motion)
         self.tree.bind('<Leave>', self.on_leave)
         self.tree.bind('<Double-Button-1>', self.on_double_click)  # Add double-click event
+        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+        self.tree.bind('<Configure>', self.on_tree_configure)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.tree.bind(sequence, self.on_mouse_wheel)
+        for sequence in ('<Up>', '<Down>', '<Prior>', '<Next>'):
+            self.tree.bind(sequence, self.on_tree_key)
         self.tree.column("Name", width=300)
         
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack the tree and scrollbar
+        # Pack the tree
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Store products data
+        # Sort order of the product list, by relevance or id until a header is clicked
+        self.sort_column = None
         self.sort_reverse = False
         
-        # Display initial products
+        # Open the database and load the first rows in the background; the
+        # list query waits for the database on the same worker
+        for button in (self.fetch_button, self.fetch_changes_button, self.push_button):
+            button.config(state=tk.DISABLED)
+        self.status_label.config(text="Opening database...", foreground="")
+        self.query_executor.submit(self.open_database)
         self.update_product_list()
     
+    def open_database(self):
+        # Runs on the query worker so importing SQLAlchemy and checking the
+        # schema don't delay the window
+        try:
+            from database import DatabaseManager
+            from product_table import ProductTableModel
+            
+            db = DatabaseManager(pragmas=self.load_config().get('sqlite_pragmas'))
+            self.product_model = ProductTableModel(db)
+            self.db = db
+        except Exception as e:
+            logger.exception("Error opening the database")
+            self.ui.post(self.status_label.config, text=f"Error opening the database: {str(e)}", foreground="red")
+            return
+        self.ui.post(self.database_opened)
+    
+    def database_opened(self):
+        for button in (self.fetch_button, self.fetch_changes_button, self.push_button):
+            button.config(state=tk.NORMAL)
+        self.status_label.config(text="")
+    
     def create_menu_bar(self):
         menubar = tk.Menu(self.root)
         self.root.config(menu=menubar)
@@ -712,6 +795,8 @@ class SyncApp:
         # File menu
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="Sync History", command=self.open_sync_history)
+        file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
         
         # Settings menu
@@ -727,23 +812,44 @@ class SyncApp:
     def open_settings(self):
         SettingsDialog(self)
     
+    def open_sync_history(self):
+        SyncHistoryDialog(self)
+    
     def show_about(self):
         messagebox.showinfo(
             "About",
             "WooCommerce Product Sync\nVersion 1.0\n\nA tool for managing WooCommerce products and synchronizing with various vendors."
         )
     
+    def get_woo_client(self):
+        """Return the shared WooCommerce client for the saved credentials.
+        
+        The client is reused across calls so its pooled connections stay
+        alive, and is only rebuilt when the credentials change.
+        """
+        credentials = env_credentials()
+        with self.woo_client_lock:
+            if self.woo_client is None or self.woo_client.credentials != credentials:
+                # Leave the previous client open, a running fetch may still use it
+                workers, _ = fetch_settings(self.load_config())
+                self.woo_client = create_client(credentials, workers)
+            return self.woo_client
+    
+    def get_sync_engine(self):
+        return SyncEngine.from_config(self.db, self.load_config(), client=self.get_woo_client())
+    
     def test_connection(self, url=None, key=None, secret=None, settings_dialog=None):
         url = (url or self.url_input.get()).rstrip('/')
         key = key or self.key_input.get()
         secret = secret or self.secret_input.get()
         
         try:
-            response = requests.get(
-                f"{self.url_input.get()}/wp-json/wc/v3/products",
-                auth=(self.key_input.get(), self.secret_input.get()),
-                params={"per_page": 1}
-            )
+            # Test the entered credentials without replacing the shared client
+            client = create_client((url, key, secret), max_retries=1)
+            try:
+                response = client.get("products", params={"per_page": 1})
+            finally:
+                client.close()
             
             if response.status_code == 200:
                 status_text = "Successfully connected to WooCommerce!"
@@ -766,139 +872,63 @@ class SyncApp:
         
         return result
 
-    def fetch_products(self):
+    def fetch_products(self, incremental=False):
+        """Fetch products from WooCommerce into the local database in the background.
+        
+        With ``incremental`` only products changed since the last complete
+        fetch are requested.
+        """
+        progress_dialog = ProgressDialog(self, 0)
+        
+        def on_progress(written, total):
+            self.ui.post(progress_dialog.set_total, total)
+            self.ui.post_latest(progress_dialog, progress_dialog.update_progress, written,
+                                f"Processed {written} of {total} products")
+        
         def fetch_thread():
             try:
-                load_dotenv(override=True)
-                url = os.getenv('WOO_API_URL', '').rstrip('/')
-                key = os.getenv('WOO_API_KEY', '')
-                secret = os.getenv('WOO_API_SECRET', '')
-                print("Fetching products from API...")
-                page = 1
-                per_page = 50
-                products_processed = 0
-                product_queue = queue.Queue(maxsize=100)
-                stop_event = threading.Event()
-                
-                # Get total number of products
-                response = requests.get(
-                    f"{url}/wp-json/wc/v3/products",
-                    auth=(key, secret),
-                    params={"per_page": 1}
-                )
-                total_items = int(response.headers.get('X-WP-Total', 0))
-                progress_dialog = ProgressDialog(self, total_items)
-                self.root.update_idletasks()
-                
-                def producer():
-                    nonlocal page, products_processed
-                    while not stop_event.is_set():
-                        try:
-                            response = requests.get(
-                                f"{url}/wp-json/wc/v3/products",
-                                auth=(key, secret),
-                                params={"per_page": per_page, "page": page}
-                            )
-                            
-                            if response.status_code == 200:
-                                products_batch = response.json()
-                                if not products_batch:
-                                    product_queue.put(None)  # Signal consumer to stop
-                                    break
-                                
-                                for product in products_batch:
-                                    if stop_event.is_set():
-                                        break
-                                    product_queue.put(product)
-                                page += 1
-                            else:
-                                print(f"Error fetching products: {response.status_code}")
-                                break
-                        except Exception as e:
-                            print(f"Error in producer thread: {str(e)}")
-                            break
-                    product_queue.put(None)  # Ensure consumer stops
-                
-                def consumer():
-                    nonlocal products_processed
-                    while not stop_event.is_set():
-                        try:
-                            product = product_queue.get(timeout=5)  # 5 seconds timeout
-                            if product is None:  # Stop signal
-                                break
-                            
-                            try:
-                                if not stop_event.is_set():
-                                    self.db.add_or_update_product(product)
-                                    products_processed += 1
-                                progress_dialog.progress['value'] = products_processed
-                                progress_dialog.label.config(text=f"Processing product {products_processed} of {total_items}")
-                            except Exception as e:
-                                print(f"Error processing product: {str(e)}")
-                            finally:
-                                product_queue.task_done()
-                        except queue.Empty:
-                            continue
-                        except Exception as e:
-                            print(f"Error in consumer thread: {str(e)}")
-                            break
-                
-                # Start producer and consumer threads
-                producer_thread = threading.Thread(target=producer)
-                consumer_thread = threading.Thread(target=consumer)
-                
-                producer_thread.start()
-                consumer_thread.start()
-                
-                # Monitor progress and check for cancellation
-                while producer_thread.is_alive() or consumer_thread.is_alive():
-                    if progress_dialog.is_cancelled:
-                        stop_event.set()  # Signal threads to stop
-                        break
-                    
-                    progress_dialog.update_progress(
-                        products_processed,
-                        f"Processed {products_processed} of {total_items} products"
-                    )
-                    time.sleep(0.1)
-                
-                # Wait for threads to finish
-                producer_thread.join()
-                consumer_thread.join()
+                summary = self.get_sync_engine().fetch_products(incremental=incremental, progress=on_progress,
+                                                                cancel=progress_dialog.cancel_token)
                 
                 # Final update
-                final_message = "Cancelled" if progress_dialog.is_cancelled else f"Completed! Processed {products_processed} products"
-                progress_dialog.update_progress(products_processed, final_message)
+                final_message = "Cancelled" if summary['cancelled'] else f"Completed! Processed {summary['processed']} products"
+                if summary['resumed'] and not summary['cancelled']:
+                    final_message += f" (resumed, {summary['skipped_pages']} pages were already fetched)"
+                if summary['conflicts']:
+                    final_message += f", kept {summary['conflicts']} products with unpushed edits"
+                self.ui.post_latest(progress_dialog, progress_dialog.update_progress,
+                                    summary['skipped'] + summary['processed'], final_message)
                 time.sleep(1)  # Show completion message briefly
-                progress_dialog.dialog.destroy()
+                self.ui.post(progress_dialog.close)
                 
                 # Refresh the product list
-                self.update_product_list()
+                self.ui.post(self.update_product_list)
                 
             except Exception as e:
-                print(f"Error in fetch thread: {str(e)}")
-                if 'progress_dialog' in locals():
-                    progress_dialog.dialog.destroy()
+                logger.exception("Error fetching products")
+                self.ui.post(progress_dialog.close)
+                self.ui.post(self.status_label.config, text=f"Error fetching products: {str(e)}", foreground="red")
         
         fetch_thread_instance = threading.Thread(target=fetch_thread)
         fetch_thread_instance.start()
 
 class ProgressDialog:
-    def __init__(self, app, total_items):
+    def __init__(self, app, total_items, title="Fetching Products"):
         self.dialog = tk.Toplevel(app.root)
-        self.dialog.title("Fetching Products")
+        self.dialog.title(title)
         self.dialog.geometry("400x180")
         self.dialog.transient(app.root)
         self.dialog.grab_set()
         self.tree = app.tree
         self.is_cancelled = False
+        self.cancel_token = CancellationToken()  # Cancelled when the user stops the work
 
         # Configure grid
         self.dialog.grid_columnconfigure(0, weight=1)
         self.dialog.grid_rowconfigure(2, weight=1)
 
         # Title label
-        self.title_label = ttk.Label(self.dialog, text="Fetching Products", font=("Helvetica", 12, "bold"))
+        self.title_label = ttk.Label(self.dialog, text=title, font=("Helvetica", 12, "bold"))
         self.title_label.grid(row=0, column=0, pady=(15, 5), padx=20)
 
         # Progress bar
@@ -925,6 +955,9 @@ class ProgressDialog:
         if self.dialog.winfo_exists():
             self.dialog.after(100, self.periodic_update)
 
+    def set_total(self, total_items):
+        self.progress['maximum'] = total_items
+
     def update_progress(self, current_item, message):
         self.progress['value'] = current_item
         self.label.config(text=message)
@@ -932,6 +965,7 @@ class ProgressDialog:
 
     def stop_fetching(self):
         self.is_cancelled = True
+        self.cancel_token.cancel()
         self.label.config(text="Stopping...")
         self.stop_button.config(state=tk.DISABLED)
 
@@ -939,39 +973,65 @@ class ProgressDialog:
         if self.dialog.winfo_exists():
             self.dialog.destroy()
 
-    def sort_treeview(self, col):
-        # Get all items in the treeview
-        items = [(self.tree.set(item, col), item) for item in self.tree.get_children('')]
-        
-        if not items:
+class SyncHistoryDialog:
+    """Recent sync runs with their throughput, request latencies and timings."""
+
+    def __init__(self, app, limit=50):
+        self.app = app
+        self.limit = limit
+        self.dialog = tk.Toplevel(app.root)
+        self.dialog.title("Sync History")
+        self.dialog.geometry("1000x400")
+        self.dialog.transient(app.root)
+
+        table_frame = ttk.Frame(self.dialog, padding="10 10 10 0")
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(table_frame, columns=STATS_COLUMNS, show="headings")
+        for col in STATS_COLUMNS:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=130 if col == "Started" else 75, anchor=tk.W if col in ("Started", "Mode", "Status") else tk.E)
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        button_frame = ttk.Frame(self.dialog, padding=10)
+        button_frame.pack(fill=tk.X)
+        self.label = ttk.Label(button_frame, text="")
+        self.label.pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Close", command=self.dialog.destroy).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Refresh", command=self.refresh).pack(side=tk.RIGHT, padx=5)
+
+        self.refresh()
+
+    def refresh(self):
+        if self.app.db is None:
+            self.label.config(text="The database is still opening")
             return
-        
-        # Determine if the column contains numeric values
-        try:
-            # Try to convert the first value to float
-            float(items[0][0]) if items[0][0] != 'N/A' else 0
-            is_numeric = True
-        except ValueError:
-            is_numeric = False
-        
-        # Sort items
-        items.sort(key=lambda x: float(x[0]) if is_numeric and x[0] != 'N/A' else (float('-inf') if x[0] == 'N/A' else x[0].lower()),
-                   reverse=getattr(self, 'sort_reverse', False))
-        
-        # Rearrange items in sorted positions
-        for index, (val, item) in enumerate(items):
-            self.tree.move(item, '', index)
-            # Maintain link style for ID column
-            if col != 'ID' and self.tree.set(item, 'ID') != 'N/A':
-                self.tree.item(item, tags=('link',))
-        
-        # Reverse sort next time
-        self.sort_reverse = not getattr(self, 'sort_reverse', False)
-        
-        # Update column headers to show sort direction
-        for column in self.tree['columns']:
-            self.tree.heading(column, text=column)
-        self.tree.heading(col, text=f"{col} {'↓' if self.sort_reverse else '↑'}")
+        self.label.config(text="Loading...")
+
+        def load():
+            try:
+                rows = format_sync_runs(self.app.db.get_sync_runs(limit=self.limit))
+            except Exception as e:
+                logger.exception("Error loading sync history")
+                self.app.ui.post(self.show_error, e)
+                return
+            self.app.ui.post(self.show_runs, rows)
+
+        self.app.query_executor.submit(load)
+
+    def show_runs(self, rows):
+        if not self.dialog.winfo_exists():
+            return
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert("", tk.END, values=row)
+        self.label.config(text=f"{len(rows)} most recent sync runs" if rows else "No sync runs recorded yet")
+
+    def show_error(self, error):
+        if self.dialog.winfo_exists():
+            self.label.config(text=f"Error loading sync history: {error}")
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,151 @@
+"""Headless sync runner for cron jobs and servers.
+
+Runs the same fetch and push as the desktop application without importing
+tkinter, shows a tqdm progress bar on stderr and prints a JSON summary with
+counts and timings on stdout::
+
+    python -m sync_cli sync --full
+    python -m sync_cli sync --incremental
+    python -m sync_cli sync --push
+    python -m sync_cli stats
+
+Credentials come from .env and fetch settings from config.json, like the
+desktop application. The exit status is 0 when everything was synced, 1
+when some pages, chunks or products failed or the run was interrupted.
+An interrupted fetch resumes where it stopped on the next run of the same
+mode, unless ``--restart`` is given. ``stats`` lists the recorded sync runs
+with their throughput, request latencies and timings.
+"""
+import argparse
+import json
+import logging
+import signal
+import sys
+from datetime import datetime
+
+from tqdm import tqdm
+from tqdm.contrib.logging import logging_redirect_tqdm
+
+from database import DatabaseManager
+from logging_config import LOG_FILE, setup_logging
+from sync_engine import STATS_COLUMNS, CancellationToken, SyncEngine, format_sync_runs, load_config
+
+logger = logging.getLogger(__name__)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='sync_cli', description="Synchronize the local product database with WooCommerce.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sync = commands.add_parser('sync', help="fetch products from or push local changes to WooCommerce")
+    mode = sync.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--full', dest='mode', action='store_const', const='full', help="fetch every product")
+    mode.add_argument('--incremental', dest='mode', action='store_const', const='incremental',
+                      help="fetch the products changed since the last complete fetch")
+    mode.add_argument('--push', dest='mode', action='store_const', const='push',
+                      help="push locally edited products")
+    sync.add_argument('--restart', action='store_true',
+                      help="start the fetch over instead of resuming an interrupted one")
+    sync.add_argument('--db', default='products.db', help="SQLite database file (default: %(default)s)")
+    sync.add_argument('--workers', type=int, help="concurrent page requests (default: fetch_workers in config.json)")
+    sync.add_argument('--per-page', type=int, help="products per page (default: fetch_per_page in config.json)")
+    sync.add_argument('--log-level', help="log level (default: log_level in config.json, else INFO)")
+    sync.add_argument('--no-progress', action='store_true', help="don't show a progress bar")
+
+    stats = commands.add_parser('stats', help="show the history and metrics of recent sync runs")
+    stats.add_argument('--db', default='products.db', help="SQLite database file (default: %(default)s)")
+    stats.add_argument('--limit', type=int, default=20, help="number of runs to show (default: %(default)s)")
+    stats.add_argument('--json', action='store_true', help="print every recorded metric as JSON")
+    stats.add_argument('--log-level', help="log level (default: log_level in config.json, else INFO)")
+    return parser
+
+class ProgressBar:
+    """Progress callback drawing a tqdm bar on stderr."""
+
+    def __init__(self, description, disable=False):
+        self.bar = tqdm(desc=description, unit='product', disable=disable, file=sys.stderr)
+
+    def __call__(self, done, total):
+        if self.bar.total != total:
+            self.bar.total = total
+        self.bar.update(done - self.bar.n)
+
+    def close(self):
+        self.bar.close()
+
+def run_sync(args, config):
+    db = DatabaseManager(f'sqlite:///{args.db}', pragmas=config.get('sqlite_pragmas'))
+    engine = SyncEngine.from_config(db, {
+        **config,
+        **({'fetch_workers': args.workers} if args.workers else {}),
+        **({'fetch_per_page': args.per_page} if args.per_page else {})
+    })
+    client = engine.client
+    if not client.url:
+        raise RuntimeError("WOO_API_URL is not set, configure the store in .env")
+
+    # Ctrl+C or a SIGTERM from the scheduler stops the sync cleanly
+    cancel = CancellationToken()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: cancel.cancel())
+
+    progress = ProgressBar("Pushing" if args.mode == 'push' else "Fetching", disable=args.no_progress)
+    try:
+        # Log records are written above the bar instead of through it
+        with logging_redirect_tqdm():
+            if args.mode == 'push':
+                summary = engine.push_changes(progress=progress, cancel=cancel)
+            else:
+                summary = engine.fetch_products(incremental=args.mode == 'incremental', progress=progress,
+                                                cancel=cancel, resume=not args.restart)
+    finally:
+        progress.close()
+        client.close()
+
+    if args.mode == 'push':
+        summary['pushed'] = len(summary['pushed'])
+        failed = bool(summary['failures'])
+    else:
+        failed = bool(summary['failed_pages'] or summary['failed_chunks'])
+    return summary, not failed and not summary['cancelled']
+
+def show_stats(args, config):
+    db = DatabaseManager(f'sqlite:///{args.db}', pragmas=config.get('sqlite_pragmas'))
+    runs = db.get_sync_runs(limit=args.limit)
+    if args.json:
+        json.dump(runs, sys.stdout, indent=2, default=lambda value: value.isoformat(timespec='seconds'))
+        sys.stdout.write('\n')
+        return 0
+
+    rows = [tuple(map(str, row)) for row in format_sync_runs(runs)]
+    widths = [max(len(value) for value in column) for column in zip(STATS_COLUMNS, *rows)]
+    for row in (STATS_COLUMNS, *rows):
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+    return 0
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = load_config()
+    setup_logging(args.log_level or config.get('log_level', 'INFO'), config.get('log_file', LOG_FILE),
+                  config.get('log_sample_rate', 5))
+    if args.command == 'stats':
+        return show_stats(args, config)
+
+    started_at = datetime.now()
+    try:
+        summary, ok = run_sync(args, config)
+    except Exception as e:
+        logger.exception("Sync failed")
+        summary, ok = {'mode': args.mode, 'error': str(e)}, False
+    finished_at = datetime.now()
+
+    summary.update({
+        'ok': ok,
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'finished_at': finished_at.isoformat(timespec='seconds')
+    })
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,560 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from dotenv import load_dotenv
+
+from logging_config import SAMPLED
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = 'config.json'
+
+# Defaults for the product fetch, overridable via config.json
+FETCH_WORKERS = 4
+FETCH_PER_PAGE = 100  # WooCommerce caps per_page at 100
+UPSERT_CHUNK_SIZE = 500  # Products written per database transaction
+RESUME_WINDOW = timedelta(hours=24)  # Older interrupted fetches start over instead of resuming
+
+# Columns of the sync history shown by ``sync_cli stats`` and the Sync History window
+STATS_COLUMNS = ('Run', 'Started', 'Mode', 'Status', 'Products', 'Pages/s', 'p50 ms', 'p95 ms', 'MB',
+                 'Write s', 'Wait s', 'Errors', 'Total s')
+
+class SyncError(RuntimeError):
+    """WooCommerce refused a request or the product to sync does not exist."""
+
+class CancellationToken:
+    """Cooperative cancellation shared between a frontend and a running sync.
+
+    The frontend calls ``cancel``; the sync checks ``cancelled`` between
+    pages, chunks and batches and stops at the next such point.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+class RequestStats:
+    """Latencies and response sizes of the HTTP requests of a sync, recorded from several threads."""
+
+    def __init__(self):
+        self.latencies = []  # Seconds from sending a request to having read its response
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, bytes_received=0):
+        with self._lock:
+            self.latencies.append(seconds)
+            self.bytes_received += bytes_received
+
+    def latency_ms(self, fraction):
+        """Nearest-rank percentile of the latencies in milliseconds, None without requests."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, max(0, int(fraction * len(latencies) + 0.5) - 1))
+        return round(latencies[index] * 1000, 1)
+
+    def summary(self):
+        return {
+            'requests': len(self.latencies),
+            'bytes': self.bytes_received,
+            'latency_ms': {'p50': self.latency_ms(0.5), 'p95': self.latency_ms(0.95), 'max': self.latency_ms(1)}
+        }
+
+    def run_metrics(self):
+        """The same figures keyed by ``sync_runs`` column."""
+        return {
+            'requests': len(self.latencies),
+            'bytes_received': self.bytes_received,
+            'latency_p50_ms': self.latency_ms(0.5),
+            'latency_p95_ms': self.latency_ms(0.95),
+            'latency_max_ms': self.latency_ms(1)
+        }
+
+def store_time(response):
+    """The store's clock from a response's Date header, as naive UTC like ``date_modified_gmt``.
+
+    Falls back to this machine's UTC clock when the header is missing or invalid.
+    """
+    try:
+        moment = parsedate_to_datetime(response.headers.get('Date'))
+    except (TypeError, ValueError):
+        moment = None
+    if moment is None:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def format_sync_runs(runs):
+    """Turn DatabaseManager.get_sync_runs dicts into STATS_COLUMNS rows, missing values shown as N/A."""
+    def number(value, digits=1):
+        return 'N/A' if value is None else f"{value:.{digits}f}"
+
+    rows = []
+    for run in runs:
+        errors = sum(run[column] or 0 for column in ('failed_pages', 'failed_chunks', 'products_failed'))
+        rows.append((
+            run['id'],
+            run['started_at'].strftime('%Y-%m-%d %H:%M') if run['started_at'] else 'N/A',
+            run['mode'],
+            run['status'],
+            'N/A' if run['products_total'] is None else f"{run['products_processed'] or 0}/{run['products_total']}",
+            number(run['pages_per_second']),
+            number(run['latency_p50_ms'], 0),
+            number(run['latency_p95_ms'], 0),
+            number(run['bytes_received'] / 1e6 if run['bytes_received'] is not None else None, 2),
+            number(run['write_seconds'], 2),
+            number(run['queue_wait_seconds'], 2),
+            errors,
+            number(run['duration_seconds'], 2)
+        ))
+    return rows
+
+def load_config(path=CONFIG_FILE):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def fetch_settings(config):
+    """Return the (workers, per_page) fetch settings from a loaded config."""
+    workers = max(1, int(config.get('fetch_workers', FETCH_WORKERS)))
+    per_page = min(max(1, int(config.get('fetch_per_page', FETCH_PER_PAGE))), 100)
+    return workers, per_page
+
+def env_credentials():
+    """Return the (url, key, secret) WooCommerce credentials saved in .env."""
+    load_dotenv(override=True)
+    return (
+        os.getenv('WOO_API_URL', '').rstrip('/'),
+        os.getenv('WOO_API_KEY', ''),
+        os.getenv('WOO_API_SECRET', '')
+    )
+
+def create_client(credentials=None, workers=FETCH_WORKERS, **kwargs):
+    """Build a WooCommerce client with a connection pool large enough for ``workers``."""
+    # Imported on first use, requests is slow to import and not needed to start the GUI
+    from woo_client import WooCommerceClient
+
+    return WooCommerceClient(*(credentials or env_credentials()), pool_size=max(10, workers), **kwargs)
+
+def product_update_payload(values):
+    # WooCommerce expects prices as strings, an empty string clears the price
+    payload = {}
+    for field, value in values.items():
+        if field in ('regular_price', 'sale_price'):
+            payload[field] = str(value) if value is not None else ''
+        else:
+            payload[field] = value
+    return payload
+
+class SyncEngine:
+    """Synchronizes the local product database with a WooCommerce store.
+
+    Frontend-agnostic: every operation takes its inputs as arguments,
+    reports progress through an optional ``progress(done, total)`` callback
+    called from the thread running the operation, stops early when its
+    CancellationToken is cancelled and returns a summary dict (counts and
+    timings in seconds) instead of touching any UI. Operations block, so
+    GUIs run them on a worker thread.
+    """
+
+    def __init__(self, db, client, workers=FETCH_WORKERS, per_page=FETCH_PER_PAGE, chunk_size=UPSERT_CHUNK_SIZE):
+        self.db = db
+        self.client = client
+        self.workers = workers
+        self.per_page = per_page
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_config(cls, db, config=None, client=None):
+        """Build an engine with the fetch settings of config.json and the .env credentials."""
+        workers, per_page = fetch_settings(load_config() if config is None else config)
+        return cls(db, client or create_client(workers=workers), workers=workers, per_page=per_page)
+
+    def fetch_products(self, incremental=False, progress=None, cancel=None, resume=True):
+        """Fetch products from WooCommerce into the local database.
+
+        With ``incremental`` only products modified since the store's stored
+        high-water mark are requested; without a mark this is a full fetch.
+        Products deleted in WooCommerce are only noticed by a full fetch.
+        Products with local edits that are not pushed yet are left as they
+        are and counted in ``conflicts``.
+
+        Pages are requested by ``workers`` threads while the calling thread
+        writes them in chunks, reporting ``progress(processed, total)`` after
+        every chunk. Pages are requested with only the fields the database
+        stores and decoded into ProductRecords while they download, so a
+        page never exists in memory as a whole JSON document.
+
+        Every fetch is recorded as a sync run with the pages written so far.
+        With ``resume`` an interrupted, failed or crashed fetch of the same
+        store and mode from the last ``RESUME_WINDOW`` continues with the
+        same query: pages it wrote are skipped and only failed or missing
+        ones are requested.
+        """
+        from woo_client import ProductRecord, read_product_records
+
+        started = time.perf_counter()
+        cancel = cancel or CancellationToken()
+        client = self.client
+        url = client.url
+        mode = 'incremental' if incremental else 'full'
+        per_page = self.per_page
+
+        # Products changed after the last seen modification date; a one second
+        # overlap covers edits made within the same second as the mark
+        modified_after = None
+        watermark = self.db.get_sync_watermark(url) if incremental else None
+        if watermark:
+            modified_after = (watermark - timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%S')
+        checkpoint = self.db.start_sync_run(url, mode, per_page, modified_after=modified_after,
+                                            resume_since=datetime.now() - RESUME_WINDOW if resume else None)
+        run_id = checkpoint.run_id
+        if checkpoint.resumed:
+            logger.info("Resuming %s fetch %d from %s, %d pages already written", mode, run_id, url,
+                        len(checkpoint.completed_pages))
+        else:
+            logger.info("Fetching %s products from %s", "changed" if incremental else "all", url)
+
+        # Ordered by id so page numbers still cover the same products when a run resumes
+        query_params = {"orderby": "id", "order": "asc"}
+        if checkpoint.modified_after:
+            query_params.update({"modified_after": checkpoint.modified_after, "dates_are_gmt": "true"})
+
+        products_processed = 0
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'conflicts': 0}
+        failed_pages = 0
+        failed_chunks = 0
+        pages_fetched = 0
+        write_seconds = 0.0
+        queue_wait_seconds = 0.0  # Writer idle, waiting for pages
+        fetch_wait_seconds = 0.0  # Fetch threads blocked on a full queue
+        request_stats = RequestStats()
+        latest_modified = None  # Newest date_modified_gmt written so far
+        product_queue = queue.Queue(maxsize=20)  # Holds (page, products) tuples
+
+        # Get total number of products
+        request_started = time.perf_counter()
+        response = client.get("products", params={**query_params, "per_page": 1, "_fields": "id"})
+        request_stats.record(time.perf_counter() - request_started, response.raw.tell())
+        if response.status_code != 200:
+            self.db.update_sync_run(run_id, status='interrupted', ended_at=datetime.now())
+            raise SyncError(f"Failed to count products: {response.status_code}")
+        # A resumed run keeps the start of its first attempt: pages written
+        # then are skipped, so edits made since must stay above the watermark
+        fetch_started = checkpoint.store_started_at
+        if fetch_started is None:
+            fetch_started = store_time(response)
+            self.db.update_sync_run(run_id, store_started_at=fetch_started)
+        total_items = int(response.headers.get('X-WP-Total', 0))
+        total_pages = (total_items + per_page - 1) // per_page
+        self.db.update_sync_run(run_id, total_pages=total_pages)
+        pages_to_fetch = [page for page in range(1, total_pages + 1) if page not in checkpoint.completed_pages]
+        skipped_pages = total_pages - len(pages_to_fetch)
+        # Products on the pages written before the run resumed
+        skipped = sum(min(per_page, total_items - (page - 1) * per_page)
+                      for page in checkpoint.completed_pages if page <= total_pages)
+        count_seconds = time.perf_counter() - started
+        if progress:
+            progress(skipped, total_items)
+
+        def fetch_page(page):
+            request_started = time.perf_counter()
+            response = client.get("products", params={**query_params, "per_page": per_page, "page": page,
+                                                      "_fields": ProductRecord.FIELDS}, stream=True)
+            if response.status_code != 200:
+                response.close()
+                request_stats.record(time.perf_counter() - request_started)
+                raise SyncError(f"status {response.status_code}")
+            records = read_product_records(response)
+            request_stats.record(time.perf_counter() - request_started, response.raw.tell())
+            return records
+
+        def enqueue(item):
+            nonlocal fetch_wait_seconds
+            # Never block forever on a full queue once the fetch is cancelled
+            wait_started = time.perf_counter()
+            try:
+                while not cancel.cancelled:
+                    try:
+                        product_queue.put(item, timeout=0.5)
+                        return
+                    except queue.Full:
+                        continue
+            finally:
+                fetch_wait_seconds += time.perf_counter() - wait_started
+
+        def producer():
+            nonlocal failed_pages, pages_fetched
+            # Fetch pages concurrently, keeping a bounded number in flight so
+            # finished pages never pile up faster than the consumer writes them
+            pages = iter(pages_to_fetch)
+            in_flight = {}
+
+            def submit_next():
+                page = next(pages, None)
+                if page is not None:
+                    in_flight[executor.submit(fetch_page, page)] = page
+
+            executor = ThreadPoolExecutor(max_workers=self.workers)
+            try:
+                for _ in range(self.workers * 2):
+                    submit_next()
+
+                while in_flight and not cancel.cancelled:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        page = in_flight.pop(future)
+                        submit_next()
+                        try:
+                            products_batch = future.result()
+                        except Exception as e:
+                            logger.error("Error fetching products page %d: %s", page, e)
+                            failed_pages += 1
+                            self.db.record_sync_pages(run_id, [page], 'failed', error=str(e))
+                            continue
+                        pages_fetched += 1
+                        logger.debug("Fetched page %d with %d products", page, len(products_batch), extra=SAMPLED)
+                        enqueue((page, products_batch))
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+                enqueue(None)  # Signal consumer to stop
+
+        producer_thread = threading.Thread(target=producer)
+        producer_thread.start()
+
+        # Write pages on this thread as they arrive
+        finished = False
+        while not finished and not cancel.cancelled:
+            wait_started = time.perf_counter()
+            try:
+                products_batch = product_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            finally:
+                queue_wait_seconds += time.perf_counter() - wait_started
+
+            # Drain pages that are already waiting so one transaction covers them all
+            chunk = []
+            chunk_pages = []
+            while True:
+                if products_batch is None:  # Stop signal
+                    finished = True
+                    break
+                page, records = products_batch
+                chunk_pages.append(page)
+                chunk.extend(records)
+                if len(chunk) >= self.chunk_size:
+                    break
+                try:
+                    products_batch = product_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if not chunk_pages or cancel.cancelled:
+                continue
+
+            write_started = time.perf_counter()
+            try:
+                result = self.db.bulk_upsert_products(chunk)
+                for field, count in result._asdict().items():
+                    counts[field] += count
+                products_processed += len(chunk)
+                chunk_latest = max((record.date_modified_gmt for record in chunk if record.date_modified_gmt),
+                                   default=None)
+                if chunk_latest and (latest_modified is None or chunk_latest > latest_modified):
+                    latest_modified = chunk_latest
+                # Checkpoint after the products are committed; a crash in
+                # between only means the pages are fetched again on resume
+                self.db.record_sync_pages(run_id, chunk_pages, latest_modified=(
+                    datetime.fromisoformat(chunk_latest) if chunk_latest else None))
+            except Exception:
+                logger.exception("Error writing %d products", len(chunk))
+                failed_chunks += 1
+            write_seconds += time.perf_counter() - write_started
+            if progress:
+                progress(skipped + products_processed, total_items)
+
+        producer_thread.join()
+        cancelled = cancel.cancelled
+        logger.info("Fetch %s: %d of %d products processed (%d new, %d updated, %d unchanged, %d kept for "
+                    "unpushed edits), %d pages and %d chunks failed", "cancelled" if cancelled else "finished",
+                    products_processed, total_items, counts['inserted'], counts['updated'], counts['unchanged'],
+                    counts['conflicts'], failed_pages, failed_chunks)
+
+        # Only a complete run may advance the watermark, otherwise the
+        # products of a skipped page would never be requested again. The
+        # pages written before a resume count towards it too. It never passes
+        # the store's time when the run first started: a product edited
+        # meanwhile on a page already written is older than the newest date
+        # seen on later pages, and must still be requested by the next
+        # incremental fetch (whose one second overlap covers the Date
+        # header's precision).
+        watermark_updated = not cancelled and not failed_pages and not failed_chunks
+        if watermark_updated:
+            newest = [value for value in (checkpoint.latest_modified,
+                                          datetime.fromisoformat(latest_modified) if latest_modified else None)
+                      if value]
+            self.db.update_sync_watermark(url, min(max(newest), fetch_started) if newest else None)
+        summary = {
+            'mode': mode,
+            'run_id': run_id,
+            'resumed': checkpoint.resumed,
+            'skipped_pages': skipped_pages,
+            'skipped': skipped,
+            'total': total_items,
+            'processed': products_processed,
+            **counts,
+            'failed_pages': failed_pages,
+            'failed_chunks': failed_chunks,
+            'cancelled': cancelled,
+            'watermark_updated': watermark_updated,
+            'pages_fetched': pages_fetched,
+            'http': request_stats.summary(),
+            'seconds': {
+                'count': round(count_seconds, 3),
+                'write': round(write_seconds, 3),
+                'queue_wait': round(queue_wait_seconds, 3),
+                'fetch_wait': round(fetch_wait_seconds, 3),
+                'total': round(time.perf_counter() - started, 3)
+            }
+        }
+        self.db.record_sync_metrics(run_id, {
+            'products_total': total_items,
+            'products_processed': products_processed,
+            'products_inserted': counts['inserted'],
+            'products_updated': counts['updated'],
+            'products_unchanged': counts['unchanged'],
+            'pages_fetched': pages_fetched,
+            'failed_pages': failed_pages,
+            'failed_chunks': failed_chunks,
+            **request_stats.run_metrics(),
+            'write_seconds': write_seconds,
+            'queue_wait_seconds': queue_wait_seconds,
+            'fetch_wait_seconds': fetch_wait_seconds,
+            'duration_seconds': summary['seconds']['total']
+        })
+        self.db.update_sync_run(run_id, status='completed' if watermark_updated else 'interrupted',
+                                ended_at=datetime.now())
+        return summary
+
+
+    def push_changes(self, progress=None, cancel=None):
+        """Push all locally edited products to WooCommerce through products/batch.
+
+        Only the edited fields are sent, reporting ``progress(done, total)``
+        after every batch. Products WooCommerce accepted are marked as synced
+        even if the push is interrupted. The summary lists the pushed ids and
+        the ``{woo_id: error}`` failures. The push is recorded as a sync run
+        with its request metrics.
+        """
+        started = time.perf_counter()
+        cancel = cancel or CancellationToken()
+        products = self.db.get_pending_changes()
+        batch_size = self.client.BATCH_SIZE
+        run_id = self.db.create_sync_run(self.client.url, 'push', batch_size)
+        request_stats = RequestStats()
+        pushed = []
+        failures = {}
+        completed = False
+        try:
+            for start in range(0, len(products), batch_size):
+                if cancel.cancelled:
+                    break
+                chunk = products[start:start + batch_size]
+                updates = [
+                    {'id': product['woo_id'], **product_update_payload(
+                        {field: change['value'] for field, change in product['changes'].items()}
+                    )}
+                    for product in chunk
+                ]
+                request_started = time.perf_counter()
+                batch = self.client.batch_update_products(updates)
+                request_stats.record(time.perf_counter() - request_started, batch.bytes_received)
+                for woo_id, error in batch.results.items():
+                    if error:
+                        logger.warning("Product %s was not updated: %s", woo_id, error)
+                        failures[woo_id] = error
+                    else:
+                        pushed.append(woo_id)
+                if progress:
+                    progress(start + len(chunk), len(products))
+            completed = not cancel.cancelled
+        finally:
+            # Record everything WooCommerce accepted, even if the push was interrupted
+            self.db.mark_products_synced(pushed)
+            duration = time.perf_counter() - started
+            self.db.record_sync_metrics(run_id, {
+                'products_total': len(products),
+                'products_processed': len(pushed),
+                'products_failed': len(failures),
+                **request_stats.run_metrics(),
+                'duration_seconds': duration
+            })
+            self.db.update_sync_run(run_id, status='completed' if completed and not failures else 'interrupted',
+                                    ended_at=datetime.now())
+
+        logger.info("Pushed %d of %d products, %d failed", len(pushed), len(products), len(failures))
+        return {
+            'mode': 'push',
+            'run_id': run_id,
+            'total': len(products),
+            'pushed': pushed,
+            'failures': failures,
+            'cancelled': cancel.cancelled,
+            'http': request_stats.summary(),
+            'seconds': {'total': round(duration, 3)}
+        }
+
+    def pull_product(self, woo_id):
+        """Replace the local copy of one product with the one in WooCommerce.
+
+        Discards unpushed local edits of the product. Raises SyncError if
+        WooCommerce does not return it.
+        """
+        from woo_client import ProductRecord
+
+        response = self.client.get(f"products/{woo_id}", params={"_fields": ProductRecord.FIELDS})
+        if response.status_code != 200:
+            raise SyncError(f"Failed to fetch product {woo_id}: {response.status_code}")
+        self.db.add_or_update_product(ProductRecord.from_payload(response.json()))
+
+    def push_product(self, woo_id):
+        """Send the local prices and stock of one product to WooCommerce.
+
+        Raises SyncError if the product is not in the database or
+        WooCommerce rejects the update.
+        """
+        product = self.db.get_product_by_id(woo_id)
+        if not product:
+            raise SyncError(f"Product {woo_id} not found in database")
+
+        update_data = product_update_payload({
+            'regular_price': product.regular_price,
+            'sale_price': product.sale_price,
+            'stock_quantity': product.stock_quantity
+        })
+        response = self.client.put(f"products/{woo_id}", json=update_data)
+        if response.status_code != 200:
+            raise SyncError(f"Failed to update product {woo_id}: {response.status_code}")
+        self.db.update_product_sync_time(woo_id)
@@ -0,0 +1,55 @@
+"""DatabaseManager behaviour on a temporary database."""
+import os
+import tempfile
+import unittest
+
+from benchmarks.mock_store import generate_catalog
+from database import DatabaseManager
+from woo_client import ProductRecord
+
+def records(size, start=0):
+    return [ProductRecord.from_payload(product) for product in generate_catalog(start + size)[start:]]
+
+class CountCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.url = f"sqlite:///{os.path.join(directory.name, 'products.db')}"
+
+    def open(self):
+        db = DatabaseManager(self.url)
+        self.addCleanup(db.engine.dispose)
+        return db
+
+    def test_count_sees_products_written_by_another_manager(self):
+        viewer, writer = self.open(), self.open()
+        writer.bulk_upsert_products(records(50))
+        self.assertEqual(viewer.count_products(), 50)
+        self.assertEqual(viewer.count_products('hammer'), viewer.count_products('hammer'))
+
+        writer.bulk_upsert_products(records(5, start=50))
+
+        self.assertEqual(viewer.count_products(), 55)
+
+class PageCursorTest(unittest.TestCase):
+    def test_previous_cursor_is_only_looked_up_when_asked_for(self):
+        db = DatabaseManager('sqlite://')
+        self.addCleanup(db.engine.dispose)
+        db.bulk_upsert_products(records(30))
+        first = db.search_products_page(limit=10)
+        second = db.search_products_page(limit=10, after=first.next_cursor)
+
+        self.assertIsNone(second.prev_cursor)
+        third = db.search_products_page(limit=10, after=second.next_cursor, with_prev=True)
+        self.assertEqual(third.prev_cursor, first.next_cursor)
+
+class InMemoryDatabaseTest(unittest.TestCase):
+    def test_in_memory_database_opens(self):
+        db = DatabaseManager('sqlite://')
+        self.addCleanup(db.engine.dispose)
+        db.bulk_upsert_products(records(5))
+
+        self.assertEqual(db.count_products(), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Sync scenarios run against benchmarks.mock_store and a temporary database."""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.mock_store import MockWooCommerce, generate_catalog
+from database import DatabaseManager
+from sync_engine import CancellationToken, SyncEngine, create_client
+
+class SyncTestCase(unittest.TestCase):
+    catalog_size = 50
+    per_page = 10
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db = DatabaseManager(f"sqlite:///{os.path.join(directory.name, 'products.db')}")
+        self.addCleanup(self.db.engine.dispose)
+        self.store = MockWooCommerce(generate_catalog(self.catalog_size)).start()
+        self.addCleanup(self.store.stop)
+        self.client = create_client((self.store.url, 'ck_test', 'cs_test'), workers=2, backoff_factor=0.01)
+        self.addCleanup(self.client.close)
+        self.engine = SyncEngine(self.db, self.client, workers=2, per_page=self.per_page)
+
+class PushThenFetchTest(SyncTestCase):
+    def test_fetch_after_push_converges_with_the_store(self):
+        self.engine.fetch_products()
+        original = self.db.get_product_by_id(1000).regular_price
+        self.db.update_product_field(1000, 'regular_price', original + 5)
+        self.assertEqual(self.engine.push_changes()['pushed'], [1000])
+
+        # The store reverts the price to the value of the first fetch
+        self.store.products[1000]['regular_price'] = f"{original:.2f}"
+        summary = self.engine.fetch_products()
+
+        self.assertEqual(summary['updated'], 1)
+        self.assertEqual(self.db.get_product_by_id(1000).regular_price, original)
+
+    def test_fetch_keeps_unpushed_edits(self):
+        self.engine.fetch_products()
+        edited = self.db.get_product_by_id(1000).regular_price + 5
+        self.db.update_product_field(1000, 'regular_price', edited)
+        self.store.touch([1000])
+
+        summary = self.engine.fetch_products()
+
+        self.assertEqual(summary['conflicts'], 1)
+        self.assertEqual(self.db.get_product_by_id(1000).regular_price, edited)
+        self.assertEqual([product['woo_id'] for product in self.db.get_pending_changes()], [1000])
+
+class RunMetricsTest(SyncTestCase):
+    def test_runs_record_every_request_and_its_bytes(self):
+        fetch = self.engine.fetch_products()
+        self.db.update_product_field(1000, 'stock_quantity', 7)
+        push = self.engine.push_changes()
+
+        # The count request and the five pages
+        self.assertEqual(fetch['http']['requests'], 6)
+        runs = {run['id']: run for run in self.db.get_sync_runs()}
+        self.assertEqual(runs[fetch['run_id']]['requests'], 6)
+        self.assertEqual(runs[push['run_id']]['requests'], 1)
+        self.assertGreater(runs[push['run_id']]['bytes_received'], 0)
+
+class WatermarkTest(SyncTestCase):
+    def test_edit_during_fetch_on_a_written_page_is_fetched_next_time(self):
+        # The newest product the fetch sees was modified after the fetch started
+        self.store.touch([1049], datetime.now(timezone.utc) + timedelta(hours=1))
+
+        def progress(done, total):
+            if total and done == total:
+                self.store.touch([1000])  # Edited in the store once its page is written
+
+        self.engine.fetch_products(progress=progress)
+        self.engine.fetch_products(incremental=True)
+
+        self.assertEqual(self.db.get_product_by_id(1000).stock_quantity, self.store.products[1000]['stock_quantity'])
+
+    def test_edit_before_resume_on_a_written_page_is_fetched_next_time(self):
+        # One page per chunk, so cancelling at the first progress leaves the last page unwritten
+        engine = SyncEngine(self.db, self.client, workers=1, per_page=self.per_page, chunk_size=self.per_page)
+        cancel = CancellationToken()
+        engine.fetch_products(progress=lambda done, total: done and cancel.cancel(), cancel=cancel)
+
+        self.store.clock_offset = timedelta(hours=1)
+        self.store.touch([1000])  # On the page written before the cancel
+        self.store.clock_offset = timedelta(hours=2)
+        self.store.touch([1049])  # On the last page, written by the resumed run
+        summary = engine.fetch_products()
+        self.assertTrue(summary['resumed'])
+        engine.fetch_products(incremental=True)
+
+        self.assertEqual(self.db.get_product_by_id(1000).stock_quantity, self.store.products[1000]['stock_quantity'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+"""Decoding of streamed WooCommerce responses."""
+import json
+import unittest
+
+from benchmarks.mock_store import generate_catalog
+from woo_client import iter_json_array
+
+def chunked(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+class IterJsonArrayTest(unittest.TestCase):
+    def test_items_split_across_chunks(self):
+        products = generate_catalog(20)
+        data = json.dumps(products, ensure_ascii=False).encode('utf-8')
+        for size in (1, 7, 4096):
+            self.assertEqual(list(iter_json_array(chunked(data, size))), products)
+
+    def test_scalar_at_the_end_of_a_chunk_waits_for_the_rest(self):
+        self.assertEqual(list(iter_json_array([b'[12', b'34, tr', b'ue]'])), [1234, True])
+
+    def test_truncated_array_raises(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'[{"id": 1}, {"id": 2}']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import itertools
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class UiBridge:
+    """Hands work from background threads to the Tk main loop.
+
+    Tk may only be used from the thread running ``mainloop``, so workers
+    never touch widgets; they ``post`` callables which the main loop runs in
+    batches every ``interval_ms``. ``post_latest`` keeps only the newest call
+    per key, so a worker reporting progress thousands of times per second
+    costs at most one widget update per tick (20 per second by default).
+    Calls run in the order they were posted.
+    """
+
+    def __init__(self, root, interval_ms=50, max_batch=500):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        self._pending = deque()  # (sequence, func, args, kwargs)
+        self._latest = {}  # key -> (sequence, func, args, kwargs)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.root.after(self.interval_ms, self._drain)
+
+    def post(self, func, *args, **kwargs):
+        with self._lock:
+            self._pending.append((next(self._sequence), func, args, kwargs))
+
+    def post_latest(self, key, func, *args, **kwargs):
+        """Like ``post``, but replaces a call with the same key that has not run yet."""
+        with self._lock:
+            self._latest[key] = (next(self._sequence), func, args, kwargs)
+
+    def _drain(self):
+        with self._lock:
+            calls = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch))]
+            # Coalesced calls posted after the ones left for the next tick wait for them
+            limit = self._pending[0][0] if self._pending else None
+            for key, call in list(self._latest.items()):
+                if limit is None or call[0] < limit:
+                    calls.append(call)
+                    del self._latest[key]
+
+        for _, func, args, kwargs in sorted(calls, key=lambda call: call[0]):
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception("Error in UI update %r", func)
+        self.root.after(self.interval_ms, self._drain)
@@ -7,6 +7,12 @@ cursor = conn.cursor()
 # Execute SQL commands to delete all records
 cursor.execute('DELETE FROM products')
 cursor.execute('DELETE FROM vendor_stocks')
+cursor.execute('DELETE FROM product_changes')
+# Forget the sync history too, or the next fetch would resume an old run or
+# only ask for products changed after the old watermark
+cursor.execute('DELETE FROM sync_run_pages')
+cursor.execute('DELETE FROM sync_runs')
+cursor.execute('DELETE FROM sync_state')
 
 # Commit changes and close the connection
 conn.commit()
@@ -0,0 +1,210 @@
+import codecs
+import json
+import logging
+import random
+import re
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s*')
+
+# Outcome of a products/batch call: the {woo_id: error} results and the
+# response size in bytes as sent over the wire
+BatchResult = namedtuple('BatchResult', ['results', 'bytes_received'])
+
+class ProductRecord(namedtuple('ProductRecord', ['id', 'name', 'sku', 'regular_price', 'sale_price',
+                                                 'stock_quantity', 'categories', 'date_modified_gmt'])):
+    """The fields of a WooCommerce product the sync uses, without the rest of the payload.
+
+    ``categories`` is a tuple of category names; the other fields keep the
+    API's values (prices are strings, '' when unset).
+    """
+    __slots__ = ()
+
+    # Value of the REST ``_fields`` parameter, so the store only sends these
+    FIELDS = ','.join(('id', 'name', 'sku', 'regular_price', 'sale_price', 'stock_quantity', 'categories',
+                       'date_modified_gmt'))
+
+    @classmethod
+    def from_payload(cls, product):
+        return cls(
+            product['id'],
+            product['name'],
+            product.get('sku', ''),
+            product.get('regular_price'),
+            product.get('sale_price'),
+            product.get('stock_quantity'),
+            tuple(category['name'] for category in product.get('categories') or ()),
+            product.get('date_modified_gmt')
+        )
+
+def iter_json_array(chunks):
+    """Yield the items of a JSON array as its bytes arrive in ``chunks``.
+
+    Each item is decoded as soon as it is complete, so only the current
+    chunk and one partial item are held in memory instead of the whole
+    document.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = False
+    for chunk in chunks:
+        buffer += text.decode(chunk)
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if not started:
+                if char != '[':
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+            elif char == ']':
+                return
+            elif char == ',':
+                pos += 1
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # Incomplete item, wait for the next chunk
+                if end == len(buffer):
+                    break  # A number or literal may continue in the next chunk
+                yield item
+                pos = end
+        buffer = buffer[pos:]
+    raise ValueError("Truncated JSON array")
+
+def read_product_records(response, chunk_size=65536):
+    """Stream a page of products from ``response`` into ProductRecords and close it."""
+    with response:
+        return [ProductRecord.from_payload(product)
+                for product in iter_json_array(response.iter_content(chunk_size=chunk_size))]
+
+class WooCommerceClient:
+    """Shared client for the WooCommerce REST API.
+
+    Owns a single ``requests.Session`` so connections are kept alive and
+    reused across calls and threads, applies timeouts to every request and
+    retries rate-limited (429) and transient server errors with exponential
+    backoff and jitter, honoring ``Retry-After`` when the store sends it.
+    """
+    API_PATH = '/wp-json/wc/v3'
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    BATCH_SIZE = 100  # WooCommerce rejects batch requests with more items
+
+    def __init__(self, url, key, secret, timeout=(10, 60), max_retries=5,
+                 backoff_factor=0.5, max_backoff=60, pool_size=10):
+        self.url = url.rstrip('/')
+        self.credentials = (self.url, key, secret)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        self.session.auth = (key, secret)
+        # Retries are handled in request() so Retry-After can be honored
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def endpoint_url(self, endpoint):
+        return f"{self.url}{self.API_PATH}/{endpoint.lstrip('/')}"
+
+    def request(self, method, endpoint, **kwargs):
+        """Send a request, retrying on connection errors, 429 and 5xx.
+
+        Returns the last response; callers check ``status_code`` as before.
+        Connection errors are re-raised once the retries are used up.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        url = self.endpoint_url(endpoint)
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning("%s %s failed (%s), retrying in %.1fs", method, endpoint, e, delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+
+            delay = self._retry_after(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+            logger.warning("%s %s returned %d, retrying in %.1fs", method, endpoint, response.status_code, delay)
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, endpoint, **kwargs):
+        return self.request('GET', endpoint, **kwargs)
+
+    def put(self, endpoint, **kwargs):
+        return self.request('PUT', endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request('POST', endpoint, **kwargs)
+
+    def batch_update_products(self, updates):
+        """Apply up to BATCH_SIZE product updates with one ``products/batch`` call.
+
+        Each update is a product payload including its ``id``. Returns a
+        BatchResult whose ``results`` map ``{woo_id: error}`` with ``error``
+        None for products that were updated; a rejected request marks every
+        product in it as failed.
+        """
+        if len(updates) > self.BATCH_SIZE:
+            raise ValueError(f"At most {self.BATCH_SIZE} updates per batch, got {len(updates)}")
+
+        response = self.post('products/batch', json={'update': updates})
+        bytes_received = response.raw.tell()  # The body is already read
+        if response.status_code != 200:
+            return BatchResult({update['id']: f"status {response.status_code}" for update in updates}, bytes_received)
+
+        # Results come back in request order
+        results = {update['id']: 'missing from batch response' for update in updates}
+        for update, item in zip(updates, response.json().get('update', [])):
+            error = item.get('error')
+            results[update['id']] = (error.get('message') or error.get('code') or str(error)) if error else None
+        return BatchResult(results, bytes_received)
+
+    def close(self):
+        self.session.close()
+
+    def _backoff(self, attempt):
+        # Full jitter keeps concurrent page workers from retrying in lockstep
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def _retry_after(self, response):
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+        return min(max(delay, 0), self.max_backoff)